@@ -0,0 +1,274 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+import TrelloClient
+import BoardSnapshot
+import BoardAggregate
+from BoardSnapshot import label_hours
+
+# Incremental collection from the board's actions feed.
+# A per-card hour table is cached on disk together with a cursor (the newest
+# action id seen). Each run reads only the actions after the cursor and applies
+# them as deltas; a full rescan happens when there is no cache, when an action
+# cannot be applied safely, or every FULL_SCAN_DAYS as a consistency check.
+# Trello's createCard payload does not list the labels a card was created with,
+# so new cards are looked up once (GET /cards/{id}) after their actions are applied.
+
+CACHE_FILE = "card_hours_cache.json"
+FULL_SCAN_DAYS = 7
+ACTIONS_PAGE_LIMIT = 1000
+RESOLVE_ONE_BY_ONE = 10  # new cards read with GET /cards/{id}; more are read from the board's cards
+ACTION_FILTER = ",".join([
+    "createCard", "copyCard", "convertToCardFromCheckItem", "moveCardToBoard",
+    "updateCard", "deleteCard", "moveCardFromBoard",
+    "addLabelToCard", "removeLabelFromCard",
+    "createLabel", "updateLabel", "deleteLabel",
+    "createList", "updateList", "moveListToBoard", "moveListFromBoard",
+])
+
+
+def empty_state(board_id):
+    return {"board": board_id, "cursor": None, "last_full_scan": None, "dirty": False,
+            "lists": {}, "labels": {}, "cards": {}, "unresolved": []}
+
+
+def load_state(path=CACHE_FILE):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable cache {path}: {e}")
+        return None
+
+
+def save_state(state, path=CACHE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _latest_action_id(board_id):
+    resp = TrelloClient.get(f"/boards/{board_id}/actions", {"filter": ACTION_FILTER, "limit": 1, "fields": "id"})
+    if resp.status_code != 200:
+        raise RuntimeError(f"Failed to fetch actions: {resp.status_code} {resp.text}")
+    actions = resp.json()
+    return actions[0]["id"] if actions else None
+
+
+def full_scan(board_id):
+    """Rebuild the per-card hour table from the board and set the cursor to the newest action."""
+    # read the cursor first so nothing that happens during the scan is missed
+    cursor = _latest_action_id(board_id)
+    state = empty_state(board_id)
+    # the scan is the consistency check, so lists and labels are never taken from the cache's TTL
+    resp = TrelloClient.get(f"/boards/{board_id}/lists", {"fields": "name,closed", "filter": "all"}, fresh=True)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Failed to fetch lists: {resp.status_code} {resp.text}")
+    for lst in resp.json():
+        state["lists"][lst["id"]] = {"name": lst.get("name", ""), "closed": lst.get("closed", False)}
+    resp = TrelloClient.get(f"/boards/{board_id}/labels", {"fields": "name", "limit": 1000}, fresh=True)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Failed to fetch labels: {resp.status_code} {resp.text}")
+    for label in resp.json():
+        state["labels"][label["id"]] = label.get("name", "")
+    resp = TrelloClient.get(f"/boards/{board_id}/cards", {"fields": "idList,idLabels"})
+    if resp.status_code != 200:
+        raise RuntimeError(f"Failed to fetch cards: {resp.status_code} {resp.text}")
+    for card in resp.json():
+        state["cards"][card["id"]] = {"list": card.get("idList"), "labels": list(card.get("idLabels", []))}
+    state["cursor"] = cursor
+    state["last_full_scan"] = datetime.now().strftime("%Y-%m-%d")
+    return state
+
+
+def fetch_actions_since(board_id, cursor):
+    """All relevant actions newer than cursor, oldest first. Pages backwards with `before`."""
+    actions = []
+    before = None
+    while True:
+        params = {"filter": ACTION_FILTER, "limit": ACTIONS_PAGE_LIMIT}
+        if cursor:
+            params["since"] = cursor
+        if before:
+            params["before"] = before
+        resp = TrelloClient.get(f"/boards/{board_id}/actions", params)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Failed to fetch actions: {resp.status_code} {resp.text}")
+        page = resp.json()
+        actions.extend(page)
+        if len(page) < ACTIONS_PAGE_LIMIT:
+            break
+        before = page[-1]["id"]
+    actions.reverse()
+    return actions
+
+
+def apply_action(state, action):
+    """
+    Apply one Trello action to the cached tables. Actions whose effect cannot
+    be reconstructed from the payload mark the state dirty, which forces a
+    full scan.
+    """
+    kind = action.get("type")
+    data = action.get("data", {})
+    card = data.get("card") or {}
+    cards = state["cards"]
+    if kind in ("createCard", "copyCard", "convertToCardFromCheckItem", "moveCardToBoard"):
+        list_id = (data.get("list") or {}).get("id") or card.get("idList")
+        # copied or moved-in cards can carry labels the payload does not list
+        if kind != "createCard" and kind != "convertToCardFromCheckItem":
+            state["dirty"] = True
+        elif "idLabels" not in card:
+            # labels given at creation are not in the payload; see resolve_cards()
+            state.setdefault("unresolved", []).append(card["id"])
+        cards[card["id"]] = {"list": list_id, "labels": list(card.get("idLabels", []))}
+    elif kind in ("deleteCard", "moveCardFromBoard"):
+        cards.pop(card.get("id"), None)
+    elif kind == "updateCard":
+        entry = cards.get(card.get("id"))
+        if "listAfter" in data and entry is not None:
+            entry["list"] = data["listAfter"]["id"]
+        if "closed" in card:
+            if card["closed"]:
+                cards.pop(card.get("id"), None)
+            elif entry is None:
+                # unarchived: labels are not in the payload
+                state["dirty"] = True
+    elif kind in ("addLabelToCard", "removeLabelFromCard"):
+        label = data.get("label") or {}
+        if label.get("id"):
+            state["labels"].setdefault(label["id"], label.get("name", ""))
+        entry = cards.get(card.get("id"))
+        if entry is not None:
+            if kind == "addLabelToCard" and label.get("id") not in entry["labels"]:
+                entry["labels"].append(label.get("id"))
+            elif kind == "removeLabelFromCard" and label.get("id") in entry["labels"]:
+                entry["labels"].remove(label.get("id"))
+    elif kind in ("createLabel", "updateLabel"):
+        label = data.get("label") or {}
+        if label.get("id"):
+            state["labels"][label["id"]] = label.get("name", "")
+    elif kind == "deleteLabel":
+        label_id = (data.get("label") or {}).get("id")
+        state["labels"].pop(label_id, None)
+        for entry in cards.values():
+            if label_id in entry["labels"]:
+                entry["labels"].remove(label_id)
+    elif kind in ("createList", "updateList", "moveListToBoard"):
+        lst = data.get("list") or {}
+        if lst.get("id"):
+            current = state["lists"].setdefault(lst["id"], {"name": "", "closed": False})
+            if "name" in lst:
+                current["name"] = lst["name"]
+            if "closed" in lst:
+                current["closed"] = lst["closed"]
+        if kind == "moveListToBoard":
+            state["dirty"] = True
+    elif kind == "moveListFromBoard":
+        list_id = (data.get("list") or {}).get("id")
+        state["lists"].pop(list_id, None)
+        for card_id in [cid for cid, entry in cards.items() if entry["list"] == list_id]:
+            del cards[card_id]
+    state["cursor"] = action["id"]
+
+
+def fetch_card(card_id):
+    """{"idList", "idLabels"} of a card as it is now, or None if it no longer exists."""
+    resp = TrelloClient.get(f"/cards/{card_id}", {"fields": "idList,idLabels"})
+    if resp.status_code == 404:
+        return None
+    if resp.status_code != 200:
+        raise RuntimeError(f"Failed to fetch card {card_id}: {resp.status_code} {resp.text}")
+    return resp.json()
+
+
+def current_cards(board_id, card_ids):
+    """
+    {card id: {"idList", "idLabels"}} of the given cards as they are now; cards
+    that no longer exist are missing. A few cards are read one by one, more
+    with one paginated read of the board's cards.
+    """
+    card_ids = list(dict.fromkeys(card_ids))
+    if len(card_ids) <= RESOLVE_ONE_BY_ONE:
+        found = zip(card_ids, TrelloClient.map_concurrent(fetch_card, card_ids))
+        return {card_id: card for card_id, card in found if card is not None}
+    wanted = set(card_ids)
+    return {card.id: {"idList": card.list_id, "idLabels": list(card.label_ids)}
+            for card in BoardSnapshot.iter_board_cards(board_id, {}) if card.id in wanted}
+
+
+def resolve_cards(state):
+    """
+    Read the current list and labels of cards created since the last resolve
+    (their labels are not in the createCard payload). Returns the number read.
+    """
+    card_ids = [card_id for card_id in dict.fromkeys(state.get("unresolved", ())) if card_id in state["cards"]]
+    state["unresolved"] = []
+    found = current_cards(state["board"], card_ids)
+    for card_id in card_ids:
+        card = found.get(card_id)
+        if card is None:
+            # deleted (or archived) again; the action saying so may not have been read yet
+            state["cards"].pop(card_id, None)
+        else:
+            state["cards"][card_id] = {"list": card.get("idList"), "labels": list(card.get("idLabels", []))}
+    return len(card_ids)
+
+
+def board_totals(state):
+    """BoardAggregate totals for the open lists, from the cached card table."""
+    hours = {label_id: label_hours(name) for label_id, name in state["labels"].items()}
+    lists = [{"id": list_id, "name": lst["name"]} for list_id, lst in state["lists"].items()
+             if not lst.get("closed")]
+    cards = (BoardSnapshot.to_card({"id": card_id, "idList": entry["list"], "idLabels": entry["labels"]}, hours)
+             for card_id, entry in state["cards"].items())
+    return BoardAggregate.aggregate(lists, cards)
+
+
+def list_totals(state):
+    """Remaining hours per open list id, from the cached card table."""
+    return {list_id: total for list_id, total in board_totals(state)["lists"].items()
+            if list_id in state["lists"] and not state["lists"][list_id].get("closed")}
+
+
+def sprint_total(state):
+    """Sum of hours on cards in lists whose name starts with 'sp '."""
+    return board_totals(state)["sprint"]
+
+
+def _needs_full_scan(state, board_id, full_scan_days):
+    if state is None or state.get("board") != board_id or state.get("dirty"):
+        return True
+    last = state.get("last_full_scan")
+    if not last:
+        return True
+    return datetime.now() - datetime.strptime(last, "%Y-%m-%d") >= timedelta(days=full_scan_days)
+
+
+def refresh_state(board_id, path=CACHE_FILE, full_scan_days=FULL_SCAN_DAYS):
+    """Bring the cached card table up to date, reading only new actions unless a full scan is due."""
+    state = load_state(path)
+    if _needs_full_scan(state, board_id, full_scan_days):
+        print("Incremental collection: running full scan")
+        state = full_scan(board_id)
+    else:
+        actions = fetch_actions_since(board_id, state["cursor"])
+        for action in actions:
+            apply_action(state, action)
+        print(f"Incremental collection: applied {len(actions)} new action(s)")
+        if not state["dirty"] and state.get("unresolved"):
+            print(f"Incremental collection: read {resolve_cards(state)} new card(s)")
+        if state["dirty"]:
+            print("Incremental collection: actions need a full scan to apply")
+            state = full_scan(board_id)
+    save_state(state, path)
+    return state
+
+
+def collect_incremental(board_id, path=CACHE_FILE, full_scan_days=FULL_SCAN_DAYS):
+    """Return the sprint total, reading only new actions unless a full scan is due."""
+    return sprint_total(refresh_state(board_id, path, full_scan_days))
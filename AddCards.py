@@ -1,17 +1,20 @@
-import requests
 import os
-from dotenv import load_dotenv
+import sys
+import json
+from collections import Counter
 import re
+import threading
+import TrelloClient
+import RunProfile
 
-load_dotenv()
-API_KEY = os.getenv("API_KEY")
-TOKEN = os.getenv("TOKEN")
-BOARD_ID = os.getenv("BOARD_ID")
+BOARD_ID = None  # read from .env (via TrelloClient) when not set here
 LIST_NAME = "General BackLog"  # Change this to your target list name
+CARD_PATTERN = re.compile(r"^(.*)\((\d+)\s*hrs?\)$")
+POS_SPACING = 65536  # Trello's own spacing between card positions
+JOURNAL_SUFFIX = ".journal"  # completed imports are appended to e.g. cards.txt.journal
 
 def get_list_id(board_id, list_name):
-    url = f"https://api.trello.com/1/boards/{board_id}/lists?key={API_KEY}&token={TOKEN}"
-    response = requests.get(url)
+    response = TrelloClient.get(f"/boards/{board_id}/lists")
     if response.status_code != 200:
         print(f"Failed to fetch lists: {response.text}")
         return None
@@ -22,124 +25,328 @@ def get_list_id(board_id, list_name):
     print(f"List '{list_name}' not found on board {board_id}.")
     return None
 
-def add_cards_from_file(filename, board_id, list_name):
-    list_id = get_list_id(board_id, list_name)
-    if not list_id:
-        print("Cannot proceed without a valid list ID.")
-        return
+def load_label_index(board_id):
+    """Fetch every label on the board once and index the ids by (name, color)."""
+    label_index = {}
+    resp = TrelloClient.get(f"/boards/{board_id}/labels", {"fields": "name,color", "limit": 1000})
+    if resp.status_code != 200:
+        print(f"Failed to fetch labels: {resp.status_code} {resp.text}")
+        return label_index
+    for label in resp.json():
+        label_index.setdefault((label.get("name", ""), label.get("color")), label["id"])
+    return label_index
+
+
+_label_lock = threading.Lock()
+_key_locks = {}  # (name, color) -> lock, so only callers creating the same label wait on each other
+
+
+def _lock_for(key):
+    with _label_lock:
+        return _key_locks.setdefault(key, threading.Lock())
 
-    # Fetch all labels on the board
-    def get_label_id(board_id, name, color):
-        url = f"https://api.trello.com/1/boards/{board_id}/labels?key={API_KEY}&token={TOKEN}"
-        resp = requests.get(url)
-        if resp.status_code == 200:
-            for label in resp.json():
-                if label["name"] == name:
-                    return label["id"]
-        # If not found, create it
-        create_url = f"https://api.trello.com/1/labels"
+
+def get_or_create_label(label_index, board_id, name, color):
+    """
+    Return the id of the (name, color) label, creating it only when it is not
+    already in the index. The index is updated in place so later lookups are
+    dict hits, and a lock per (name, color) keeps concurrent callers from
+    creating duplicates while different labels are still created in parallel.
+    """
+    key = (name, color)
+    with _lock_for(key):
+        label_id = label_index.get(key)
+        if label_id:
+            return label_id
         params = {
-            "key": API_KEY,
-            "token": TOKEN,
             "idBoard": board_id,
             "name": name,
             "color": color
         }
-        create_resp = requests.post(create_url, params=params)
+        create_resp = TrelloClient.post("/labels", params)
         if create_resp.status_code == 200:
-            return create_resp.json()["id"]
-        else:
-            print(f"Failed to create label: {create_resp.text}")
-            return None
+            label_id = create_resp.json()["id"]
+            with _label_lock:
+                label_index[key] = label_id
+            return label_id
+        print(f"Failed to create label: {create_resp.text}")
+        return None
+
+
+def hour_label_color(label_value):
+    if label_value == "1":
+        return "green"
+    elif label_value == "2":
+        return "yellow"
+    elif label_value == "4":
+        return "orange"
+    return "red"
+
+
+def create_card(list_id, card_name, label_ids, pos=None):
+    """Create a card with its labels attached inline (one POST). Returns the card dict or None."""
+    params = {
+        "idList": list_id,
+        "name": card_name,
+    }
+    if label_ids:
+        params["idLabels"] = ",".join(label_ids)
+    if pos is not None:
+        params["pos"] = pos
+    response = TrelloClient.post("/cards", params)
+    if response.status_code == 200:
+        print(f"Created card: {card_name} with {len(label_ids)} label(s)")
+        return response.json()
+    print(f"Failed to create card: {response.text}")
+    return None
+
+
+def _report_request_rate(request_total, cards_created):
+    if cards_created:
+        print(f"Imported {cards_created} card(s) with {request_total} Trello request(s) "
+              f"({request_total / cards_created:.2f} requests per card)")
+    else:
+        print(f"No cards imported ({request_total} Trello request(s))")
+
+
+def load_import_journal(path, board_id):
+    """Return {(heading, name, line_num): card_id} for cards already imported to board_id."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r") as f:
+        for raw in f:
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                # a torn final line from an interrupted run
+                continue
+            if entry.get("board") == board_id:
+                done[(entry.get("heading"), entry["name"], entry["line_num"])] = entry.get("id")
+    return done
+
+
+def journal_base_pos(path, board_id):
+    """The list position the pipeline import journaled for board_id (see record_import), or None."""
+    base_pos = None
+    if not os.path.exists(path):
+        return base_pos
+    with open(path, "r") as f:
+        for raw in f:
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                continue
+            if entry.get("board") == board_id and entry.get("base_pos") is not None:
+                base_pos = entry["base_pos"]
+    return base_pos
+
+
+_journal_lock = threading.Lock()
+
+
+def record_import(path, board_id, card, card_id, base_pos=None):
+    """
+    Append one completed card to the journal and flush it to disk immediately.
+    The pipeline also records the position its card positions are counted
+    from, so a resumed import places the remaining cards between the ones
+    created before.
+    """
+    entry = {
+        "board": board_id,
+        "heading": card["heading"],
+        "name": card["name"],
+        "line_num": card["line_num"],
+        "id": card_id,
+    }
+    if base_pos is not None:
+        entry["base_pos"] = base_pos
+    with _journal_lock:
+        with open(path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def existing_card_names(list_id):
+    """Count the names of the cards already in the target list."""
+    resp = TrelloClient.get(f"/lists/{list_id}/cards", {"fields": "name"})
+    if resp.status_code != 200:
+        print(f"Failed to fetch existing cards: {resp.status_code} {resp.text}")
+        return Counter()
+    return Counter(card.get("name", "") for card in resp.json())
+
+
+def already_imported(card, journal, existing_names):
+    """
+    True if the card was journaled by an earlier run or a card with the same
+    name is already in the list. Each existing card can only satisfy one line.
+    """
+    journaled = (card["heading"], card["name"], card["line_num"]) in journal
+    if existing_names[card["name"]] > 0:
+        existing_names[card["name"]] -= 1
+        return True
+    return journaled
+
+
+def add_cards_from_file(filename, board_id, list_name):
+    list_id = get_list_id(board_id, list_name)
+    if not list_id:
+        print("Cannot proceed without a valid list ID.")
+        return
+
+    # Fetch all labels on the board once; hour-label lookups below are dict hits
+    label_index = load_label_index(board_id)
+    # Work finished by an earlier (possibly interrupted) run is skipped
+    journal_path = filename + JOURNAL_SUFFIX
+    journal = load_import_journal(journal_path, board_id)
+    existing_names = existing_card_names(list_id)
 
     current_heading = None
     heading_label_id = None
+    cards_created = 0
+    cards_skipped = 0
+    requests_before = TrelloClient.request_count
     with open(filename, "r") as f:
         for line_num, line in enumerate(f, 1):
             line = line.strip()
             if not line:
                 continue
             # Check if line is a card or a heading
-            match = re.match(r"^(.*)\((\d+)\s*hrs?\)$", line)
+            match = CARD_PATTERN.match(line)
             if match:
                 card_name = match.group(1).strip()
                 label_value = match.group(2)
-                # Create card
-                url = f"https://api.trello.com/1/cards"
-                params = {
-                    "key": API_KEY,
-                    "token": TOKEN,
-                    "idList": list_id,
-                    "name": card_name,
-                }
-                response = requests.post(url, params=params)
-                if response.status_code == 200:
-                    card = response.json()
-                    card_id = card["id"]
-                    print(f"Created card: {card_name}")
-
-                    # Add hour label
-                    if label_value:
-                        if label_value == "1":
-                            color = "green"
-                        elif label_value == "2":
-                            color = "yellow"
-                        elif label_value == "4":
-                            color = "orange"
-                        else:
-                            color = "red"
-                        label_id = get_label_id(board_id, label_value, color)
-                        print(f"Hour label id for value {label_value}: {label_id}")
-                        if label_id:
-                            add_label_url = f"https://api.trello.com/1/cards/{card_id}/idLabels"
-                            add_label_params = {
-                                "key": API_KEY,
-                                "token": TOKEN,
-                                "value": label_id
-                            }
-                            add_label_resp = requests.post(add_label_url, params=add_label_params)
-                            print(f"Hour label response: {add_label_resp.status_code} {add_label_resp.text}")
-                            if add_label_resp.status_code == 200:
-                                print(f"Added label {label_value} to card {card_name}")
-                            else:
-                                print(f"Failed to add label: {add_label_resp.text}")
-                    # Add heading label
-                    print(f"Current heading: {current_heading}, heading_label_id: {heading_label_id}")
-                    if heading_label_id:
-                        add_label_url = f"https://api.trello.com/1/cards/{card_id}/idLabels"
-                        add_label_params = {
-                            "key": API_KEY,
-                            "token": TOKEN,
-                            "value": heading_label_id
-                        }
-                        add_label_resp = requests.post(add_label_url, params=add_label_params)
-                        print(f"Heading label response: {add_label_resp.status_code} {add_label_resp.text}")
-                        if add_label_resp.status_code == 200:
-                            print(f"Added heading label '{current_heading}' to card {card_name}")
-                        else:
-                            print(f"Failed to add heading label: {add_label_resp.text}")
-                else:
-                    print(f"Failed to create card: {response.text}")
+                card = {"line_num": line_num, "heading": current_heading, "name": card_name, "hours": label_value}
+                if already_imported(card, journal, existing_names):
+                    print(f"Skipping already imported card: {card_name}")
+                    cards_skipped += 1
+                    continue
+                # Resolve label ids first so the card is created with them in one request
+                label_ids = []
+                if label_value:
+                    label_id = get_or_create_label(label_index, board_id, label_value, hour_label_color(label_value))
+                    print(f"Hour label id for value {label_value}: {label_id}")
+                    if label_id:
+                        label_ids.append(label_id)
+                print(f"Current heading: {current_heading}, heading_label_id: {heading_label_id}")
+                if heading_label_id:
+                    label_ids.append(heading_label_id)
+                created = create_card(list_id, card_name, label_ids)
+                if created:
+                    record_import(journal_path, board_id, card, created["id"])
+                    cards_created += 1
             else:
-                # Treat as heading
+                # Treat as heading; an existing blue label with the same name is reused
                 current_heading = line
-                # Always create a new label for each heading
-                create_url = f"https://api.trello.com/1/labels"
-                params = {
-                    "key": API_KEY,
-                    "token": TOKEN,
-                    "idBoard": board_id,
-                    "name": current_heading,
-                    "color": "blue"
-                }
-                create_resp = requests.post(create_url, params=params)
-                if create_resp.status_code == 200:
-                    heading_label_id = create_resp.json()["id"]
-                    print(f"Created new heading label: {current_heading}, heading_label_id: {heading_label_id}")
-                else:
-                    heading_label_id = None
-                    print(f"Failed to create heading label: {create_resp.text}")
+                heading_label_id = get_or_create_label(label_index, board_id, current_heading, "blue")
+                print(f"Heading label: {current_heading}, heading_label_id: {heading_label_id}")
+
+    if cards_skipped:
+        print(f"Skipped {cards_skipped} card(s) already imported")
+    _report_request_rate(TrelloClient.request_count - requests_before, cards_created)
+
+
+def parse_cards_file(filename):
+    """
+    Parse a cards file into an import plan without touching the network.
+    Returns (headings, cards): headings in first-seen order and one dict per
+    card line with line_num, heading, name and hours.
+    """
+    headings = []
+    cards = []
+    current_heading = None
+    with open(filename, "r") as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            match = CARD_PATTERN.match(line)
+            if match:
+                cards.append({
+                    "line_num": line_num,
+                    "heading": current_heading,
+                    "name": match.group(1).strip(),
+                    "hours": match.group(2),
+                })
+            else:
+                current_heading = line
+                if current_heading not in headings:
+                    headings.append(current_heading)
+    return headings, cards
+
+
+def _next_list_pos(list_id):
+    """Position just below the current bottom card so imported cards are appended."""
+    resp = TrelloClient.get(f"/lists/{list_id}/cards", {"fields": "pos"})
+    if resp.status_code != 200:
+        return POS_SPACING
+    positions = [card.get("pos", 0) for card in resp.json()]
+    return (max(positions) if positions else 0) + POS_SPACING
+
+
+def import_cards_pipeline(filename, board_id, list_name):
+    """
+    Staged, concurrent version of add_cards_from_file: parse the whole file,
+    create heading and hour labels in parallel, then create every card in
+    parallel through the client's rate-limited pool. Each card gets an
+    explicit pos so the list keeps the file's order.
+    """
+    headings, cards = parse_cards_file(filename)
+    print(f"Planned {len(cards)} card(s) under {len(headings)} heading(s)")
+    list_id = get_list_id(board_id, list_name)
+    if not list_id:
+        print("Cannot proceed without a valid list ID.")
+        return
+    requests_before = TrelloClient.request_count
+    label_index = load_label_index(board_id)
+    journal_path = filename + JOURNAL_SUFFIX
+    journal = load_import_journal(journal_path, board_id)
+    existing_names = existing_card_names(list_id)
+    pending = [(i, card) for i, card in enumerate(cards) if not already_imported(card, journal, existing_names)]
+    if len(pending) < len(cards):
+        print(f"Skipping {len(cards) - len(pending)} card(s) already imported")
+    cards = [card for _, card in pending]
+    headings = [h for h in headings if any(card["heading"] == h for card in cards)]
+
+    heading_ids = dict(zip(headings, TrelloClient.map_concurrent(
+        lambda heading: get_or_create_label(label_index, board_id, heading, "blue"), headings)))
+    hour_values = sorted({card["hours"] for card in cards})
+    hour_ids = dict(zip(hour_values, TrelloClient.map_concurrent(
+        lambda value: get_or_create_label(label_index, board_id, value, hour_label_color(value)), hour_values)))
+
+    # a resumed import keeps counting from the position of its first run
+    base_pos = journal_base_pos(journal_path, board_id)
+    if base_pos is None:
+        base_pos = _next_list_pos(list_id)
+
+    def create_planned_card(indexed_card):
+        index, card = indexed_card
+        label_ids = [i for i in (hour_ids.get(card["hours"]), heading_ids.get(card["heading"])) if i]
+        created = create_card(list_id, card["name"], label_ids, pos=base_pos + index * POS_SPACING)
+        if created:
+            record_import(journal_path, board_id, card, created["id"], base_pos)
+        return created
+
+    # positions use the index in the full plan and the journaled base position,
+    # so resumed cards land between the ones created before, in file order
+    results = TrelloClient.map_concurrent(create_planned_card, pending)
+    cards_created = sum(1 for r in results if r)
+    _report_request_rate(TrelloClient.request_count - requests_before, cards_created)
+
 
 # Usage example:
 # add_cards_from_file("cards.txt", BOARD_ID, LIST_NAME)
-add_cards_from_file("cards.txt", BOARD_ID, LIST_NAME)
+# python AddCards.py -pipeline  (parallel, rate-limited import)
+if __name__ == "__main__":
+    if "-cprofile" in sys.argv:
+        RunProfile.start_cprofile()
+    board_id = BOARD_ID or TrelloClient.env("BOARD_ID")
+    with RunProfile.phase("import"):
+        if "-pipeline" in sys.argv:
+            import_cards_pipeline("cards.txt", board_id, LIST_NAME)
+        else:
+            add_cards_from_file("cards.txt", board_id, LIST_NAME)
+    RunProfile.write_profile()
+    if "-cprofile" in sys.argv:
+        RunProfile.stop_cprofile()
@@ -0,0 +1,270 @@
+import argparse
+import json
+import os
+import shutil
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+import TrelloClient
+import ActionsFeed
+import BoardAggregate
+import SeriesStore
+from BoardSnapshot import label_hours
+
+# Backfill of days missing from "Long Term.txt" (days the daily job did not run).
+#
+# The board's action history is downloaded once, newest first as Trello serves
+# it, page by page into a spool directory. The pages are then replayed oldest
+# first through ActionsFeed.apply_action() starting from an empty board, and
+# the sprint total is kept up to date from each card's before/after hours, so
+# the replay is linear in the number of actions (only list and label renames
+# trigger a recount). Trello's createCard payload omits the labels a card was
+# created with, so once the download is complete the labels each new card had
+# at creation are rebuilt from its current labels by undoing the label actions
+# newer than its createCard, and written into the spooled action.
+#
+# The daily job runs at 00:00 UTC, so the value it records for day D is the
+# total at the end of D-1; gaps between the first and last recorded day in
+# Long Term.txt are filled the same way.
+#
+# After every page the replay state is checkpointed. An interrupted download
+# resumes from its last page and an interrupted replay resumes from the last
+# checkpoint, downloading only the actions newer than it.
+#
+#   python Backfill.py [--board BOARD_ID] [--fresh]
+
+CHECKPOINT_FILE = "backfill_checkpoint.json"
+SPOOL_DIR = "backfill_spool"
+SERIES_FILE = "Long Term.txt"
+PAGE_LIMIT = ActionsFeed.ACTIONS_PAGE_LIMIT
+# actions that can change the hours of many cards at once
+RECOUNT_ACTIONS = {"updateLabel", "deleteLabel", "createList", "updateList", "moveListToBoard", "moveListFromBoard"}
+
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable {path}: {e}")
+        return None
+
+
+def _save_json(data, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def new_progress(board_id):
+    """Replay state for an empty board: cached tables, running total and end-of-day totals."""
+    return {"board": board_id, "state": ActionsFeed.empty_state(board_id), "total": 0,
+            "day": None, "days": {}, "inexact": 0}
+
+
+def download(board_id, since, spool=SPOOL_DIR):
+    """
+    Page backwards through the actions newer than `since` (all of them if
+    None), one spool file per page, newest page first. Resumes an interrupted
+    download for the same board and `since`. Returns the spool metadata.
+    """
+    meta_path = os.path.join(spool, "meta.json")
+    meta = _load_json(meta_path)
+    if meta is None or meta.get("board") != board_id or meta.get("since") != since:
+        shutil.rmtree(spool, ignore_errors=True)
+        os.makedirs(spool)
+        meta = {"board": board_id, "since": since, "before": None, "pages": 0, "complete": False, "labelled": False}
+    while not meta["complete"]:
+        params = {"filter": ActionsFeed.ACTION_FILTER, "limit": PAGE_LIMIT}
+        if since:
+            params["since"] = since
+        if meta["before"]:
+            params["before"] = meta["before"]
+        page = list(TrelloClient.iter_json(f"/boards/{board_id}/actions", params))
+        _write_page(spool, meta["pages"], page)
+        meta["pages"] += 1
+        meta["before"] = page[-1]["id"] if page else None
+        meta["complete"] = len(page) < PAGE_LIMIT
+        _save_json(meta, meta_path)
+    if not meta.get("labelled"):
+        _fill_created_labels(board_id, spool, meta["pages"])
+        meta["labelled"] = True
+        _save_json(meta, meta_path)
+    return meta
+
+
+def _page_path(spool, index):
+    return os.path.join(spool, f"page_{index:06d}.jsonl")
+
+
+def _read_page(spool, index):
+    """One spooled page, newest action first as downloaded."""
+    with open(_page_path(spool, index), "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _write_page(spool, index, page):
+    path = _page_path(spool, index)
+    with open(path + ".tmp", "w") as f:
+        for action in page:
+            f.write(json.dumps(action, separators=(",", ":")) + "\n")
+    os.replace(path + ".tmp", path)
+
+
+def _created_without_labels(action):
+    return action.get("type") in ("createCard", "convertToCardFromCheckItem") \
+        and "idLabels" not in (action.get("data", {}).get("card") or {})
+
+
+def _fill_created_labels(board_id, spool, pages):
+    """
+    Write the labels each card had when it was created into its spooled
+    createCard action. The current labels of all created cards are read once;
+    walking the pages newest first, every label added to a card since is taken
+    off and every label removed is put back until its createCard is reached.
+    Cards that no longer exist are left without labels (counted as inexact).
+    """
+    created = [action["data"]["card"]["id"] for index in range(pages) for action in _read_page(spool, index)
+               if _created_without_labels(action)]
+    if not created:
+        return
+    labels = {card_id: set(card.get("idLabels", []))
+              for card_id, card in ActionsFeed.current_cards(board_id, created).items()}
+    for index in range(pages):
+        page = _read_page(spool, index)
+        changed = False
+        for action in page:
+            kind = action.get("type")
+            data = action.get("data", {})
+            card_labels = labels.get((data.get("card") or {}).get("id"))
+            if card_labels is None:
+                continue
+            label_id = (data.get("label") or {}).get("id")
+            if kind == "addLabelToCard":
+                card_labels.discard(label_id)
+            elif kind == "removeLabelFromCard" and label_id:
+                card_labels.add(label_id)
+            elif _created_without_labels(action):
+                data["card"]["idLabels"] = sorted(labels.pop(data["card"]["id"]))
+                changed = True
+        if changed:
+            _write_page(spool, index, page)
+
+
+def spooled_pages(spool, pages):
+    """Spooled pages oldest first, each as a list of actions in chronological order."""
+    for index in range(pages - 1, -1, -1):
+        page = _read_page(spool, index)
+        page.reverse()
+        yield page
+
+
+def _learn_lists(state, data):
+    # lists created before the history starts are only known from card payloads
+    for key in ("list", "listBefore", "listAfter"):
+        lst = data.get(key) or {}
+        if lst.get("id") and "name" in lst and lst["id"] not in state["lists"]:
+            state["lists"][lst["id"]] = {"name": lst["name"], "closed": False}
+
+
+def _card_hours(state, card_id):
+    """Hours the card contributes to the sprint total right now."""
+    entry = state["cards"].get(card_id)
+    if entry is None:
+        return 0
+    lst = state["lists"].get(entry["list"])
+    if lst is None or lst.get("closed") or not BoardAggregate.is_sprint_list(lst["name"]):
+        return 0
+    return sum(label_hours(state["labels"].get(label_id)) for label_id in entry["labels"])
+
+
+def replay(actions, progress):
+    """Apply chronologically ordered actions, closing each UTC day's total as the next day starts."""
+    state = progress["state"]
+    for action in actions:
+        day = action["date"][:10]
+        if progress["day"] is not None and day != progress["day"]:
+            progress["days"][progress["day"]] = progress["total"]
+        progress["day"] = day
+        data = action.get("data", {})
+        _learn_lists(state, data)
+        if action.get("type") in RECOUNT_ACTIONS:
+            ActionsFeed.apply_action(state, action)
+            progress["total"] = ActionsFeed.sprint_total(state)
+        else:
+            card_id = (data.get("card") or {}).get("id")
+            before = _card_hours(state, card_id)
+            ActionsFeed.apply_action(state, action)
+            progress["total"] += _card_hours(state, card_id) - before
+        if state["dirty"] or state.get("unresolved"):
+            # e.g. a copied or since deleted card whose labels are not in the payload; counted as best we can
+            progress["inexact"] += 1
+            state["dirty"] = False
+            state["unresolved"] = []
+
+
+def day_totals(progress):
+    """{day: sprint total at the end of that day}, including the day in progress."""
+    days = dict(progress["days"])
+    if progress["day"] is not None:
+        days[progress["day"]] = progress["total"]
+    return days
+
+
+def fill_gaps(days, path=SERIES_FILE):
+    """
+    Add every missing day between the first and last day of the series, valued
+    at the replayed total when that day began (the end of the last earlier day
+    with any activity), as the 00:00 UTC job records it. Existing values are
+    never changed. Returns the filled days.
+    """
+    entries, start_date = SeriesStore.read_series(path)
+    if not entries:
+        return []
+    series = dict(entries)
+    known = sorted(days)
+    filled = []
+    day = datetime.strptime(min(series), "%Y-%m-%d")
+    last = datetime.strptime(max(series), "%Y-%m-%d")
+    while day <= last:
+        date_str = day.strftime("%Y-%m-%d")
+        if date_str not in series:
+            i = bisect_left(known, date_str)
+            if i:
+                series[date_str] = days[known[i - 1]]
+                filled.append(date_str)
+        day += timedelta(days=1)
+    if filled:
+        SeriesStore.write_series(path, sorted(series.items()), start_date)
+    return filled
+
+
+def run(board_id, fresh=False, checkpoint=CHECKPOINT_FILE, spool=SPOOL_DIR, series=SERIES_FILE):
+    """Download and replay the action history (resuming where possible) and fill the series gaps."""
+    progress = None if fresh else _load_json(checkpoint)
+    if progress is None or progress.get("board") != board_id:
+        progress = new_progress(board_id)
+    meta = download(board_id, progress["state"]["cursor"], spool)
+    replayed = 0
+    for page in spooled_pages(spool, meta["pages"]):
+        replay(page, progress)
+        replayed += len(page)
+        _save_json(progress, checkpoint)
+    shutil.rmtree(spool, ignore_errors=True)
+    filled = fill_gaps(day_totals(progress), series)
+    print(f"Backfill: replayed {replayed} action(s), {len(progress['days'])} day(s) of history")
+    if progress["inexact"]:
+        print(f"Backfill: {progress['inexact']} action(s) could not be replayed exactly")
+    print(f"Backfill: filled {len(filled)} missing day(s) in {series}" + (f": {', '.join(filled)}" if filled else ""))
+    return filled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill missing days in Long Term.txt from the board's action history")
+    parser.add_argument("--board", help="board id (defaults to BOARD_ID from .env)")
+    parser.add_argument("--fresh", action="store_true", help="ignore the checkpoint and replay from the beginning")
+    args = parser.parse_args()
+    run(args.board or TrelloClient.env("BOARD_ID"), args.fresh)
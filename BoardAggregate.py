@@ -0,0 +1,136 @@
+import BoardSnapshot
+import SnapshotArchive
+
+# One aggregation pass over a board snapshot.
+# The collectors used to walk the board separately, each with its own list
+# rules: the daily burndown counts lists named "sp ...", the product total
+# counts every list that is not finished, and the backflow counts every card.
+# aggregate() reads the cards once and produces all of those totals together,
+# plus per-list and per-label breakdowns, and the entry points in
+# BurnDownChart.py, ProductBackflow.py and ActionsFeed.py are views over it.
+# The same pass also splits the sprint total by heading label (see HeadingSeries).
+# collect() archives the snapshot it reads (see SnapshotArchive), so the totals
+# can be recomputed later under different rules.
+
+SPRINT_PREFIX = "sp "
+FINISHED_WORDS = ("finish", "done", "complete")
+HEADING_COLOR = "blue"  # AddCards tags every card with a blue label named after its heading
+NO_HEADING = "(no heading)"
+
+
+def is_sprint_list(name, prefix=SPRINT_PREFIX):
+    return (name or "").lower().startswith(prefix.lower())
+
+
+def is_finished_list(name, words=FINISHED_WORDS):
+    name = (name or "").lower()
+    return any(word.lower() in name for word in words)
+
+
+def aggregate(lists, cards, group_by=(), rules=None):
+    """
+    Totals for one snapshot in a single pass over `cards` (any iterable of
+    BoardSnapshot.Card, e.g. a streaming iterator). Returns a dict:
+      sprint    hours on cards in "sp " lists
+      product   hours on cards in lists that are not finished
+      finished  hours on cards in finished lists
+      board     hours on every card, whatever its list
+      lists     {list id: hours}
+      labels    {label id: hours of the cards carrying that label}
+      groups    {label id or None: sprint hours}, each sprint card counted
+                under its first label in `group_by` (None if it has none),
+                so the groups add up to sprint
+    Cards whose list is not in `lists` (e.g. closed lists) only count towards
+    board, lists and labels. `rules` may override the list rules per board:
+    {"sprint_prefix": "sp ", "finished_words": ["finish", "done", "complete"]}.
+    """
+    return combine(lists, [tally(cards, group_by)], rules)
+
+
+def tally(cards, group_by=()):
+    """
+    Hours of `cards` per list, per label and per (list id, group), where a
+    card's group is its first label in `group_by` (None if it has none).
+    Tallies of disjoint sets of cards add up; combine() turns them into totals.
+    """
+    group_by = set(group_by)
+    by_list = {}
+    by_label = {}
+    list_groups = {}
+    board = 0
+    for card in cards:
+        hours = card.hours
+        board += hours
+        by_list[card.list_id] = by_list.get(card.list_id, 0) + hours
+        group = None
+        for label_id in card.label_ids:
+            by_label[label_id] = by_label.get(label_id, 0) + hours
+            if group is None and label_id in group_by:
+                group = label_id
+        key = (card.list_id, group)
+        list_groups[key] = list_groups.get(key, 0) + hours
+    return {"board": board, "lists": by_list, "labels": by_label, "list_groups": list_groups}
+
+
+def combine(lists, tallies, rules=None):
+    """Totals (see aggregate) from the tallies of one snapshot's cards."""
+    rules = rules or {}
+    prefix = rules.get("sprint_prefix", SPRINT_PREFIX)
+    finished_words = rules.get("finished_words", FINISHED_WORDS)
+    sprint_ids = {lst["id"] for lst in lists if is_sprint_list(lst.get("name", ""), prefix)}
+    if len(tallies) == 1:
+        by_list, by_label, board = tallies[0]["lists"], tallies[0]["labels"], tallies[0]["board"]
+    else:
+        by_list = {}
+        by_label = {}
+        board = 0
+        for part in tallies:
+            board += part["board"]
+            for list_id, hours in part["lists"].items():
+                by_list[list_id] = by_list.get(list_id, 0) + hours
+            for label_id, hours in part["labels"].items():
+                by_label[label_id] = by_label.get(label_id, 0) + hours
+    groups = {}
+    for part in tallies:
+        for (list_id, group), hours in part["list_groups"].items():
+            if list_id in sprint_ids:
+                groups[group] = groups.get(group, 0) + hours
+    sprint = product = finished = 0
+    for lst in lists:
+        hours = by_list.get(lst["id"], 0)
+        name = lst.get("name", "")
+        if lst["id"] in sprint_ids:
+            sprint += hours
+        if is_finished_list(name, finished_words):
+            finished += hours
+        else:
+            product += hours
+    return {"sprint": sprint, "product": product, "finished": finished, "board": board,
+            "lists": by_list, "labels": by_label, "groups": groups}
+
+
+def heading_totals(labels, groups):
+    """Sprint hours per heading name (labels with HEADING_COLOR), NO_HEADING for the rest."""
+    names = {label["id"]: label.get("name", "") for label in labels}
+    headings = {}
+    for label_id, hours in groups.items():
+        name = names.get(label_id, NO_HEADING) if label_id is not None else NO_HEADING
+        headings[name] = headings.get(name, 0) + hours
+    return headings
+
+
+def collect(board_id, rules=None):
+    """
+    Fetch a projected snapshot of the board and aggregate it as the cards
+    stream in. The result also carries `headings`, the sprint total split by
+    heading label, from the same requests.
+    """
+    lists, labels, cards = BoardSnapshot.fetch(board_id)
+    archive = SnapshotArchive.archive_for_collect()
+    if archive is not None:
+        cards = archive.record(board_id, lists, labels, cards)
+    heading_color = (rules or {}).get("heading_color", HEADING_COLOR)
+    heading_ids = [label["id"] for label in labels if label.get("color") == heading_color]
+    totals = aggregate(lists, cards, heading_ids, rules)
+    totals["headings"] = heading_totals(labels, totals["groups"])
+    return totals
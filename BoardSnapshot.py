@@ -0,0 +1,125 @@
+import TrelloClient
+
+# Compact, projected view of a board for the collectors.
+# Only the fields the totals need are requested: cards come back as
+# id,idList,idLabels and labels as id,name,color. Label names are parsed to integer
+# hours once per label, and every card is kept as a small __slots__ record with
+# its label ids and pre-summed hours instead of the full JSON dict, so large
+# boards cost far fewer bytes on the wire and far less memory once parsed.
+#
+# Board cards are read in pages (limit + before) and each page is parsed as it
+# downloads, so iter_board_cards() yields records one at a time and memory stays
+# flat however many cards the board has.
+
+CARD_FIELDS = "idList,idLabels"
+LIST_FIELDS = "name"
+LABEL_FIELDS = "name,color"
+CARDS_PAGE_LIMIT = 1000
+
+
+class Card:
+    __slots__ = ("id", "list_id", "label_ids", "hours")
+
+    def __init__(self, card_id, list_id, label_ids, hours):
+        self.id = card_id
+        self.list_id = list_id
+        self.label_ids = label_ids
+        self.hours = hours
+
+    def __repr__(self):
+        return f"Card({self.id!r}, {self.list_id!r}, {self.label_ids!r}, {self.hours})"
+
+
+def label_hours(name):
+    """Hours encoded by a label name, or 0 for non-integer labels."""
+    try:
+        return int((name or "").strip())
+    except ValueError:
+        return 0
+
+
+def _get_json(path, params, what):
+    # small responses (lists, labels) are read whole
+    resp = TrelloClient.get(path, params)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Failed to fetch {what}: {resp.status_code} {resp.text}")
+    return resp.json()
+
+
+def fetch_lists(board_id, fields=LIST_FIELDS):
+    return _get_json(f"/boards/{board_id}/lists", {"fields": fields}, "lists")
+
+
+def fetch_labels(board_id):
+    return _get_json(f"/boards/{board_id}/labels", {"fields": LABEL_FIELDS, "limit": 1000}, "labels")
+
+
+def hours_table(labels):
+    """{label id: hours} (0 for non-integer names)."""
+    return {label["id"]: label_hours(label.get("name")) for label in labels}
+
+
+def fetch_label_hours(board_id):
+    """{label id: hours} for every label on the board (0 for non-integer names)."""
+    return hours_table(fetch_labels(board_id))
+
+
+def to_card(raw, hours_by_label):
+    """
+    Card record from a projected card payload. Accepts idLabels (resolved
+    through hours_by_label) or embedded labels, whose names are parsed once
+    and added to hours_by_label.
+    """
+    if "idLabels" in raw:
+        label_ids = tuple(raw["idLabels"])
+    else:
+        label_ids = []
+        for label in raw.get("labels", ()):
+            if label["id"] not in hours_by_label:
+                hours_by_label[label["id"]] = label_hours(label.get("name"))
+            label_ids.append(label["id"])
+        label_ids = tuple(label_ids)
+    hours = 0
+    for label_id in label_ids:
+        hours += hours_by_label.get(label_id, 0)
+    return Card(raw["id"], raw.get("idList"), label_ids, hours)
+
+
+def iter_board_cards(board_id, hours_by_label, since=None, page_size=CARDS_PAGE_LIMIT):
+    """
+    Card records for the whole board (newer than the card id `since`, if
+    given), newest first. Pages back with `before` until a short page.
+    """
+    before = None
+    while True:
+        params = {"fields": CARD_FIELDS, "limit": page_size}
+        if before:
+            params["before"] = before
+        if since:
+            params["since"] = since
+        count = 0
+        oldest = None
+        for raw in TrelloClient.iter_json(f"/boards/{board_id}/cards", params):
+            count += 1
+            if oldest is None or raw["id"] < oldest:
+                oldest = raw["id"]
+            yield to_card(raw, hours_by_label)
+        # a short (or unpaginated, oversized) page, or no progress, means we are done
+        if count != page_size or (before is not None and oldest >= before):
+            return
+        before = oldest
+
+
+def iter_list_cards(list_id, hours_by_label):
+    for raw in TrelloClient.iter_json(f"/lists/{list_id}/cards", {"fields": CARD_FIELDS}):
+        yield to_card(raw, hours_by_label)
+
+
+def fetch(board_id):
+    """
+    (lists, labels, cards) for the whole board. cards is an iterator over
+    iter_board_cards(), consumed as the caller aggregates it.
+    """
+    lists = fetch_lists(board_id)
+    labels = fetch_labels(board_id)
+    return lists, labels, iter_board_cards(board_id, hours_table(labels))
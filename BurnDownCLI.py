@@ -0,0 +1,239 @@
+import argparse
+import os
+import sys
+
+# Command line entry point for the burndown tools.
+# Each subcommand imports the modules it needs inside its handler, so `--help`
+# and the file-only commands start without loading requests, dotenv or
+# matplotlib, and no module does any work just by being imported.
+#
+#   python BurnDownCLI.py collect [--per-list | --incremental] [--render] [--graph]
+#   python BurnDownCLI.py collect-boards [--config boards.json]
+#   python BurnDownCLI.py product [--backflow] [--graph]
+#   python BurnDownCLI.py render [--formats png svg] [--workers N] [--force]
+#   python BurnDownCLI.py forecast
+#   python BurnDownCLI.py import-cards [--file cards.txt] [--list "General BackLog"] [--pipeline]
+#   python BurnDownCLI.py backfill [--fresh]
+#   python BurnDownCLI.py watch [--port 8787] [--callback-url URL]
+#   python BurnDownCLI.py replay [--board ID] [--sprint-prefix P] [--write FILE] [--workers N]
+#   python BurnDownCLI.py clear
+#
+# Every run appends its per-endpoint request timings and phase durations to
+# run_profile.jsonl (--no-profile to skip); --cprofile adds a cProfile dump.
+
+
+def cmd_collect(args):
+    import BurnDownChart
+    import RunProfile
+    with RunProfile.phase("load"):
+        BurnDownChart.LoadDataFromFile()
+    with RunProfile.phase("collect"):
+        if not BurnDownChart.CollectData(snapshot=not args.per_list, incremental=args.incremental):
+            # nothing is written, and the non-zero exit fails the scheduled run
+            return 1
+    with RunProfile.phase("save"):
+        BurnDownChart.SaveDataToFile()
+    # Always update product info based on Long Term.txt after collecting data
+    with RunProfile.phase("update"):
+        BurnDownChart.UpdateProductInfoFromLongTerm()
+    if args.render:
+        import RenderCharts
+        with RunProfile.phase("render"):
+            RenderCharts.render_all()
+    if args.graph:
+        BurnDownChart.ShowDataGraph()
+    return 0
+
+
+def cmd_product(args):
+    if args.backflow:
+        import ProductBackflow
+        ProductBackflow.rebuild_product_info(graph=args.graph)
+        return 0
+    import BurnDownChart
+    BurnDownChart.UpdateProductInfoFromLongTerm()
+    if args.graph:
+        BurnDownChart.ShowProductGraph()
+    return 0
+
+
+def cmd_render(args):
+    import RenderCharts
+    RenderCharts.render_all(args.out, tuple(args.formats), args.force, args.workers)
+    return 0
+
+
+def cmd_forecast(args):
+    import time
+    import RenderCharts
+    import SeriesStore
+    import Velocity
+    named = {}
+    for job in RenderCharts.chart_jobs():
+        if job["kind"] != "stacked" and os.path.exists(job["path"]):
+            named[job["name"]] = SeriesStore.read_series(job["path"])[0]
+    start = time.perf_counter()
+    results = Velocity.analyze_many(named, window=args.window)
+    elapsed = time.perf_counter() - start
+
+    def fmt(day):
+        return day.strftime("%Y-%m-%d") if day else "-"
+
+    print(f"{'series':28} {'fit/day':>8} {'7d/day':>8} {'last/day':>8}  {'completion':10}  95% range")
+    for name, result in results.items():
+        if result is None:
+            print(f"{name:28} not enough data")
+            continue
+        # burn between the last two points, per day
+        last = f"{result['deltas'][-1]:8.2f}" if len(result["deltas"]) else f"{'-':>8}"
+        print(f"{name:28} {result['velocity']:8.2f} {result['rolling_velocity']:8.2f} {last}  "
+              f"{fmt(result['completion']):10}  {fmt(result['completion_early'])} .. {fmt(result['completion_late'])}")
+    print(f"Analyzed {len(results)} series in {elapsed * 1000:.1f} ms")
+    return 0
+
+
+def cmd_import_cards(args):
+    import AddCards
+    import TrelloClient
+    board_id = args.board or TrelloClient.env("BOARD_ID")
+    if args.pipeline:
+        AddCards.import_cards_pipeline(args.file, board_id, args.list)
+    else:
+        AddCards.add_cards_from_file(args.file, board_id, args.list)
+    return 0
+
+
+def cmd_backfill(args):
+    import Backfill
+    import TrelloClient
+    filled = Backfill.run(args.board or TrelloClient.env("BOARD_ID"), args.fresh)
+    if filled:
+        # recompute ProductInfo.txt for the filled days as well
+        import BurnDownChart
+        BurnDownChart.UpdateProductInfoFromLongTerm()
+    return 0
+
+
+def cmd_watch(args):
+    import Watch
+    import TrelloClient
+    Watch.watch(args.board or TrelloClient.env("BOARD_ID"), args.host, args.port, args.callback_url,
+                args.debounce, args.max_delay)
+    return 0
+
+
+def cmd_collect_boards(args):
+    import MultiBoard
+    results = MultiBoard.collect_all(MultiBoard.load_config(args.config))
+    # every board has been written; a failure still fails the run so CI notices
+    return 1 if any(r["error"] for r in results) else 0
+
+
+def cmd_replay(args):
+    import SnapshotArchive
+    SnapshotArchive.run_replay(args)
+    return 0
+
+
+def cmd_clear(args):
+    import BurnDownChart
+    if BurnDownChart.ClearData() == 0:
+        print("Data cleared.")
+        return 0
+    return 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="BurnDownCLI.py", description="Trello burndown tools")
+    parser.add_argument("--no-profile", dest="profile", action="store_false",
+                        help="do not append this run to run_profile.jsonl")
+    parser.add_argument("--cprofile", action="store_true", help="also write a cProfile dump to run_profile.prof")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("collect", help="collect today's sprint total from Trello and update the series")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--per-list", action="store_true", help="one request per 'sp ' list (original path)")
+    mode.add_argument("--incremental", action="store_true", help="apply only new board actions")
+    p.add_argument("--render", action="store_true", help="write chart images afterwards")
+    p.add_argument("--graph", action="store_true", help="show the burndown chart afterwards")
+    p.set_defaults(func=cmd_collect)
+
+    p = sub.add_parser("collect-boards", help="collect every board in a config file, plus a portfolio rollup")
+    p.add_argument("--config", default="boards.json")
+    p.set_defaults(func=cmd_collect_boards)
+
+    p = sub.add_parser("product", help="update ProductInfo.txt from Long Term.txt (no network)")
+    p.add_argument("--backflow", action="store_true",
+                   help="rebuild ProductInfo.txt from the board label total and the sprint file instead")
+    p.add_argument("--graph", action="store_true", help="show the product chart afterwards")
+    p.set_defaults(func=cmd_product)
+
+    p = sub.add_parser("render", help="write chart images for every series (no network)")
+    p.add_argument("--out", default="charts")
+    p.add_argument("--formats", nargs="+", default=["png"], choices=["png", "svg"])
+    p.add_argument("--force", action="store_true", help="redraw even if the data is unchanged")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("forecast", help="velocity and projected completion date for every series (no network)")
+    p.add_argument("--window", type=int, default=14, help="days of history used for the fit")
+    p.set_defaults(func=cmd_forecast)
+
+    p = sub.add_parser("import-cards", help="create Trello cards from a cards file")
+    p.add_argument("--file", default="cards.txt")
+    p.add_argument("--list", default="General BackLog", help="target list name")
+    p.add_argument("--board", help="board id (defaults to BOARD_ID from .env)")
+    p.add_argument("--pipeline", action="store_true", help="parallel, rate-limited import")
+    p.set_defaults(func=cmd_import_cards)
+
+    p = sub.add_parser("backfill", help="fill missing days in Long Term.txt from the board's action history")
+    p.add_argument("--board", help="board id (defaults to BOARD_ID from .env)")
+    p.add_argument("--fresh", action="store_true", help="ignore the checkpoint and replay from the beginning")
+    p.set_defaults(func=cmd_backfill)
+
+    p = sub.add_parser("watch", help="keep Long Term.txt current from Trello webhooks")
+    p.add_argument("--board", help="board id (defaults to BOARD_ID from .env)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8787)
+    p.add_argument("--callback-url", help="public URL of this receiver; registers the webhook")
+    p.add_argument("--debounce", type=float, default=5.0, help="seconds of quiet before flushing")
+    p.add_argument("--max-delay", type=float, default=60.0, help="longest a change waits to be flushed")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("replay", help="recompute totals from the snapshot archive under new rules (no network)")
+    p.add_argument("--board", help="board id (defaults to every archived board)")
+    p.add_argument("--rules", help="JSON file with sprint_prefix, finished_words and/or heading_color")
+    p.add_argument("--sprint-prefix")
+    p.add_argument("--finished-words", nargs="+")
+    p.add_argument("--heading-color")
+    p.add_argument("--series", default="sprint", choices=["sprint", "product", "finished", "board"],
+                   help="total printed and written per day")
+    p.add_argument("--write", metavar="FILE", help="write the replayed daily totals to this series file")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--archive", default="snapshot_archive")
+    p.set_defaults(func=cmd_replay)
+
+    p = sub.add_parser("clear", help="clear Long Term.txt after confirmation")
+    p.set_defaults(func=cmd_clear)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.profile and not args.cprofile:
+        return args.func(args)
+    # per-request and per-phase timings appended to run_profile.jsonl,
+    # plus a cProfile dump with --cprofile
+    import RunProfile
+    if args.cprofile:
+        RunProfile.start_cprofile()
+    try:
+        return args.func(args)
+    finally:
+        if args.profile:
+            RunProfile.write_profile()
+        RunProfile.stop_cprofile()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,21 @@
-import requests
 import json
+from bisect import bisect_left
 from datetime import datetime, timedelta
 import sys
 import os
-from dotenv import load_dotenv
-
-# Load secrets from .env file (create .env with API_KEY, TOKEN, BOARD_ID)
-load_dotenv()
-API_KEY = os.getenv("API_KEY")
-TOKEN = os.getenv("TOKEN")
-BOARD_ID = os.getenv("BOARD_ID")
+import TrelloClient
+import BoardSnapshot
+import BoardAggregate
+import ActionsFeed
+import SeriesStore
+import Snapshots
+import HeadingSeries
+import RenderCharts
+import RunProfile
+
+# Secrets come from the .env file (create .env with API_KEY, TOKEN, BOARD_ID),
+# loaded by TrelloClient the first time they are needed
+BOARD_ID = None
 BOARD_LONGID = ""
 
 fileName = "Long Term"
@@ -17,118 +23,98 @@ productData = "ProductInfo"
 cardsLeftToDo = 0
 startDate = None
 graphMap = {}
+# today's sprint hours per heading label, filled in by the snapshot collector
+headingBreakdown = None
+
+def _board_id():
+    return BOARD_ID or TrelloClient.env("BOARD_ID")
+
 
 def _fetch_product_label_sum(board_id):
     """Sum integer label names for all cards excluding finished lists."""
     try:
-        # get lists to determine finished lists
-        url = f"https://api.trello.com/1/boards/{board_id}/lists?key={API_KEY}&token={TOKEN}"
-        resp = requests.get(url)
-        if resp.status_code != 200:
-            print(f"Failed to fetch lists for product sum: {resp.status_code} {resp.text}")
-            return None
-        lists = resp.json()
-        finished_list_ids = set()
-        for lst in lists:
-            name = lst.get("name", "").lower()
-            if any(k in name for k in ("finish", "done", "complete")):
-                finished_list_ids.add(lst.get("id"))
-
-        total = 0
-        # iterate lists and sum labels for cards not in finished lists
-        for lst in lists:
-            lid = lst.get("id")
-            if lid in finished_list_ids:
-                continue
-            url_cards = f"https://api.trello.com/1/lists/{lid}/cards?key={API_KEY}&token={TOKEN}&fields=labels"
-            r = requests.get(url_cards)
-            if r.status_code != 200:
-                print(f"Failed to fetch cards for list {lid}: {r.status_code} {r.text}")
-                continue
-            for card in r.json():
-                for label in card.get("labels", []):
-                    name = label.get("name", "").strip()
-                    try:
-                        total += int(name)
-                    except ValueError:
-                        continue
-        return total
+        return BoardAggregate.collect(board_id)["product"]
     except Exception as e:
         print("Error computing product label sum:", e)
         return None
 
 
 def _read_sprint_file(path):
-    entries = []
-    start = None
-    if not os.path.exists(path):
-        return entries, start
-    with open(path, "r") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line:
-                continue
-            parts = line.split(",")
-            if parts[0] == "StartDate":
-                if len(parts) > 1:
-                    start = parts[1]
-            else:
-                try:
-                    val = float(parts[1]) if "." in parts[1] else int(parts[1])
-                except Exception:
-                    val = 0
-                entries.append((parts[0], val))
-    return entries, start
+    # served from the indexed store; the file is only re-parsed if it changed on disk
+    return SeriesStore.read_series(path)
 
 
 def _write_product_file(path, entries, start_date=None):
-    with open(path, "w") as f:
-        for dateStr, val in entries:
-            if isinstance(val, float) and val.is_integer():
-                val_out = int(val)
-            else:
-                val_out = val
-            f.write(f"{dateStr},{val_out}\n")
-        if start_date is not None:
-            f.write(f"StartDate,{start_date}\n")
-def CollectData():
+    # rewrites only from the first line that changed
+    SeriesStore.write_series(path, entries, start_date)
+
+
+def _collect_per_list():
+    """Original path: one /lists/{id}/cards request per 'sp ' list, fetched in parallel. None on failure."""
+    board_id = _board_id()
+    try:
+        lists = BoardSnapshot.fetch_lists(board_id)
+        hours = BoardSnapshot.fetch_label_hours(board_id)
+        # Check if list name starts with 'sp ' (case-insensitive)
+        sprint_list_ids = [lst["id"] for lst in lists if BoardAggregate.is_sprint_list(lst["name"])]
+
+        def list_sum(list_id):
+            return sum(card.hours for card in BoardSnapshot.iter_list_cards(list_id, hours))
+
+        return sum(TrelloClient.map_concurrent(list_sum, sprint_list_ids))
+    except RuntimeError as e:
+        print(e)
+        print("Request failed. Check your URL, params, and credentials.")
+        return None
+
+
+def _collect_snapshot():
+    """Snapshot path: constant number of requests regardless of list count. None on failure."""
+    global headingBreakdown
+    try:
+        totals = BoardAggregate.collect(_board_id())
+        headingBreakdown = totals["headings"]
+        return totals["sprint"]
+    except RuntimeError as e:
+        print(e)
+        print("Request failed. Check your URL, params, and credentials.")
+        return None
+
+
+def _collect_incremental():
+    """Incremental path: only the board actions since the last run. None on failure."""
+    try:
+        return ActionsFeed.collect_incremental(_board_id())
+    except RuntimeError as e:
+        print(e)
+        print("Request failed. Check your URL, params, and credentials.")
+        return None
+
+
+def CollectData(snapshot=True, incremental=False):
+    """Add today's sprint total to graphMap. Returns False (recording nothing) if collection failed."""
     global cardsLeftToDo
     global startDate
-    #test
     # Only count lists whose name starts with 'sp '
-    url = f"https://api.trello.com/1/boards/{BOARD_ID}/lists?key={API_KEY}&token={TOKEN}"
-    response = requests.get(url)
-    # print("Status code:", response.status_code)
-    # print("Raw response:", response.text)
-    if response.status_code != 200:
-        # data = response.json()
-        # print(data)
-        print("Request failed. Check your URL, params, and credentials.")
-    lists = response.json()
-    accepted_Lists = []
-    for lst in lists:
-        # Check if list name starts with 'sp ' (case-insensitive)
-        if lst["name"].lower().startswith("sp "):
-            accepted_Lists.append(lst)
-            LIST_ID = lst["id"]
-            url = f"https://api.trello.com/1/lists/{LIST_ID}/cards?key={API_KEY}&token={TOKEN}"
-            response = requests.get(url)
-            cards_List = response.json()
-            for cards in cards_List:
-                label_sum = 0
-                for label in cards.get("labels", []):
-                    try:
-                        label_sum += int(label["name"])
-                    except (ValueError, KeyError):
-                        continue
-                cardsLeftToDo += label_sum
-    #             print(cards["name"], cards["id"])
-    #         print("*****************")
-    # print("Total Cards Left To Do:", cardsLeftToDo)
+    before = TrelloClient.request_count
+    if incremental:
+        # apply only new board actions to the cached per-card hour table
+        total = _collect_incremental()
+    elif snapshot:
+        total = _collect_snapshot()
+    else:
+        total = _collect_per_list()
+    print(f"Trello requests for collection: {TrelloClient.request_count - before}")
+    if total is None:
+        # a failed run must not be recorded as 0 hours left
+        print("Collection failed; today's value was not recorded.")
+        return False
+    cardsLeftToDo += total
     if(startDate is None):
         startDate = datetime.now()
     currentDate = datetime.now()
     graphMap[currentDate.strftime("%Y-%m-%d")] = cardsLeftToDo
+    return True
 
 
 
@@ -137,73 +123,53 @@ def CollectData():
 def SaveDataToFile():
     global startDate
     global graphMap
-    with open(fileName + ".txt", "w") as f: 
-        for dateStr, cardsLeft in graphMap.items():
-            f.write(f"{dateStr},{cardsLeft}\n")
-        if(startDate is not None):
-            f.write(f"StartDate,{startDate.strftime('%Y-%m-%d')}\n")
-        f.close()
-    
+    start = startDate.strftime('%Y-%m-%d') if startDate is not None else None
+    SeriesStore.write_series(fileName + ".txt", list(graphMap.items()), start)
+    # timestamped copy of today's value, so several runs a day keep their intraday points
+    today = datetime.now().strftime("%Y-%m-%d")
+    if today in graphMap:
+        Snapshots.record(fileName + ".txt", graphMap[today])
+    if headingBreakdown is not None:
+        table = HeadingSeries.load()
+        if HeadingSeries.record(table, datetime.now().strftime("%Y-%m-%d"), headingBreakdown):
+            HeadingSeries.save(table)
+
 
 
 def LoadDataFromFile():
-    with open(fileName + ".txt", "r") as f:
-        lines = f.readlines()
-        for line in lines:
-            parts = line.strip().split(',')
-            if parts[0] == "StartDate":
-                global startDate
-                startDate = datetime.strptime(parts[1], '%Y-%m-%d')
-            else:
-                dateStr = parts[0]
-                cardsLeft = int(parts[1])
-                graphMap[dateStr] = cardsLeft
-        f.close()
-    # for dateStr, cardsLeft in graphMap.items():
-    #     print(f"Date: {dateStr}, Cards Left: {cardsLeft}")
-    # print("Start Date:", startDate.strftime('%Y-%m-%d'))
+    global startDate
+    entries, start = SeriesStore.read_series(fileName + ".txt")
+    for dateStr, cardsLeft in entries:
+        graphMap[dateStr] = int(cardsLeft)
+    if start is not None:
+        startDate = datetime.strptime(start, '%Y-%m-%d')
 
 
 
 def ShowDataGraph(end_date=None):
     import matplotlib.pyplot as plt
 
-    dates = []
-    cardsLeft = []
-
-    for dateStr in sorted(graphMap.keys()):
-        try:
-            dates.append(datetime.strptime(dateStr, '%Y-%m-%d'))
-            cardsLeft.append(graphMap[dateStr])
-        except ValueError:
-            print(f"Skipping invalid date: {dateStr}")
+    # intraday snapshots when the range is short enough, one point per day otherwise
+    entries = Snapshots.load(fileName + ".txt") or list(graphMap.items())
+    dates, cardsLeft = RenderCharts.parse_dated(entries)
 
     if not dates:
         print('No data to plot')
         return
 
     # Recommended line: true straight line from first day (start value) to a fixed end date
-    plt.figure(figsize=(10, 5))
-    plt.plot(dates, cardsLeft, marker='o', label='Actual')
-    if len(dates) > 1:
-        total_items = cardsLeft[0]
-        # fixed recommended target date
-        end_date = datetime(2025, 12, 8)
-        # draw recommended line to end_date:
-        plt.plot([dates[0], end_date], [total_items, 0], linestyle='--', color='red', label='Recommended')
-        try:
-            plt.xlim(dates[0], end_date)
-        except Exception:
-            pass
-
-    plt.xlabel('Date')
-    plt.ylabel('Cards Left to Do')
-    plt.title('Burn Down Chart')
-    plt.grid(True)
-    plt.xticks(rotation=45)
-    plt.ylim(0, max(cardsLeft) + 2)
-    plt.legend()
-    plt.tight_layout()
+    RenderCharts.draw_burndown(plt, dates, cardsLeft, 'Burn Down Chart', end_date or RenderCharts.SPRINT_END_DATE,
+                               forecast=RenderCharts.forecast_for(entries))
+    plt.show()
+
+
+def ShowHeadingGraph():
+    import matplotlib.pyplot as plt
+    dates, names, rows = HeadingSeries.frame(HeadingSeries.load())
+    if not dates:
+        print('No heading data to plot')
+        return
+    RenderCharts.draw_stacked(plt, [datetime.strptime(d, '%Y-%m-%d') for d in dates], names, rows)
     plt.show()
 
 
@@ -213,44 +179,12 @@ def ShowProductGraph():
     if not os.path.exists(prod_file):
         print(f"Product file not found: {prod_file}")
         return
-    dates = []
-    vals = []
-    with open(prod_file, 'r') as f:
-        for raw in f:
-            line = raw.strip()
-            if not line:
-                continue
-            parts = line.split(',')
-            if parts[0] == 'StartDate':
-                continue
-            try:
-                dates.append(datetime.strptime(parts[0], '%Y-%m-%d'))
-                if '.' in parts[1]:
-                    vals.append(float(parts[1]))
-                else:
-                    vals.append(int(parts[1]))
-            except Exception as e:
-                print(f"Skipping invalid product line: {line} ({e})")
+    entries, _ = SeriesStore.read_series(prod_file)
+    dates, vals = RenderCharts.parse_dated(entries)
     if not dates:
         print('No product data to plot')
         return
-    plt.figure(figsize=(10,5))
-    plt.plot(dates, vals, marker='o', label='Product Backlog')
-    # recommended straight line target Dec 9
-    year = dates[0].year
-    target_date = datetime(year, 12, 9)
-    if target_date <= dates[0]:
-        target_date = datetime(year+1, 12, 9)
-    start_val = vals[0]
-    plt.plot([dates[0], target_date], [start_val, 0], linestyle='--', color='red', label='Recommended')
-    plt.xlabel('Date')
-    plt.ylabel('Product Backlog')
-    plt.title('Product Backlog')
-    plt.grid(True)
-    plt.xticks(rotation=45)
-    plt.ylim(0, max(vals) + 2)
-    plt.legend()
-    plt.tight_layout()
+    RenderCharts.draw_product(plt, dates, vals, 'Product Backlog', RenderCharts.forecast_for(entries))
     plt.show()
 
 def UpdateProductInfoFromLongTerm():
@@ -259,8 +193,9 @@ def UpdateProductInfoFromLongTerm():
     Formula: new_product_value = original_product_value - (sprint_start_value - current_sprint_value)
     """
     try:
-        # Read Long Term.txt data
-        lt_entries, lt_start = _read_sprint_file("Long Term.txt")
+        # Read Long Term.txt data (daily tier: the file, plus snapshots for any day it lacks)
+        _, lt_start = _read_sprint_file("Long Term.txt")
+        lt_entries = Snapshots.load("Long Term.txt", resolution=Snapshots.DAILY)
         if not lt_entries or not lt_start:
             print("No data in Long Term.txt or no start date found")
             return
@@ -291,38 +226,41 @@ def UpdateProductInfoFromLongTerm():
         original_product_value = prod_dict[lt_start]
         print(f"Original product value at start: {original_product_value}")
         
-        # Process each date in Long Term.txt
-        for date_str, current_sprint_value in lt_entries:
-            if date_str in prod_dict:
-                # Calculate new product value using the formula:
-                # new_product_value = original_product_value - (sprint_start_value - current_sprint_value)
-                sprint_change = sprint_start_value - current_sprint_value
-                new_product_value = original_product_value - sprint_change
-                
+        # Both series as sorted date arrays built once (%Y-%m-%d sorts chronologically),
+        # walked together in a single linear merge
+        lt_dates = sorted(lt_dict)
+        prod_dates = sorted(prod_dict)
+        merged_dates = []
+        merged_values = []
+        i = 0
+        for date_str in lt_dates:
+            # carry over product-only dates that come before this Long Term date
+            while i < len(prod_dates) and prod_dates[i] < date_str:
+                merged_dates.append(prod_dates[i])
+                merged_values.append(prod_dict[prod_dates[i]])
+                i += 1
+            current_sprint_value = lt_dict[date_str]
+            # new_product_value = original_product_value - (sprint_start_value - current_sprint_value)
+            sprint_change = sprint_start_value - current_sprint_value
+            new_product_value = original_product_value - sprint_change
+            if i < len(prod_dates) and prod_dates[i] == date_str:
                 old_value = prod_dict[date_str]
-                prod_dict[date_str] = new_product_value
-                
+                i += 1
                 print(f"Updated {date_str}: {old_value} -> {new_product_value}")
-                print(f"  Sprint: {sprint_start_value} -> {current_sprint_value} (change: {sprint_change})")
-                
             else:
                 # Handle missing dates - use previous product value and apply the same logic
-                prev_product_value = _get_previous_product_value(prod_dict, date_str)
+                prev_product_value = _get_previous_product_value(merged_dates, merged_values, date_str)
                 if prev_product_value == 0:
                     # If no previous value found, use the original start value
                     prev_product_value = original_product_value
-                
-                sprint_change = sprint_start_value - current_sprint_value
-                new_product_value = original_product_value - sprint_change
-                
-                prod_dict[date_str] = new_product_value
                 print(f"Added {date_str}: {new_product_value} (based on start: {original_product_value})")
-                print(f"  Sprint: {sprint_start_value} -> {current_sprint_value} (change: {sprint_change})")
-        
-        # Convert back to list of tuples and sort by date
-        updated_entries = [(date_str, value) for date_str, value in prod_dict.items()]
-        updated_entries.sort(key=lambda x: x[0])
-        
+            print(f"  Sprint: {sprint_start_value} -> {current_sprint_value} (change: {sprint_change})")
+            merged_dates.append(date_str)
+            merged_values.append(new_product_value)
+        merged_dates.extend(prod_dates[i:])
+        merged_values.extend(prod_dict[d] for d in prod_dates[i:])
+        updated_entries = list(zip(merged_dates, merged_values))
+
         # Write updated data back to file
         _write_product_file(productData + ".txt", updated_entries, prod_start)
         print("ProductInfo.txt updated successfully based on Long Term.txt sprint changes")
@@ -331,29 +269,13 @@ def UpdateProductInfoFromLongTerm():
         print(f"Error updating ProductInfo from Long Term: {e}")
 
 
-def _get_previous_product_value(prod_dict, target_date):
+def _get_previous_product_value(dates, values, target_date):
     """
-    Get the value from the previous available date in ProductInfo
+    Get the value from the previous available date, given parallel arrays
+    sorted by date
     """
-    # Convert target date to datetime for comparison
-    from datetime import datetime
-    target_dt = datetime.strptime(target_date, "%Y-%m-%d")
-    
-    # Find the closest previous date
-    prev_value = 0  # Default if no previous date found
-    prev_dt = None
-    
-    for date_str, value in prod_dict.items():
-        try:
-            date_dt = datetime.strptime(date_str, "%Y-%m-%d")
-            if date_dt < target_dt:
-                if prev_dt is None or date_dt > prev_dt:
-                    prev_dt = date_dt
-                    prev_value = value
-        except ValueError:
-            continue
-    
-    return prev_value
+    i = bisect_left(dates, target_date)
+    return values[i - 1] if i > 0 else 0
 
 
 def ClearData():
@@ -365,31 +287,55 @@ def ClearData():
     graphMap = {}
     startDate = datetime.now()
     SaveDataToFile()
+    # otherwise load() would serve the sub-daily snapshots for the days the file no longer has
+    Snapshots.clear(fileName + ".txt")
     return 0
 
 
-if len(sys.argv) > 1 and sys.argv.__contains__("-clear"):
-    if(ClearData() == 0):
-        print("Data cleared.")
-        sys.exit()
-
-LoadDataFromFile()
-CollectData()
-SaveDataToFile()
-
-# Always update product info based on Long Term.txt after collecting data
-UpdateProductInfoFromLongTerm()
-
-if len(sys.argv) > 1 and sys.argv.__contains__("-graph"):
-    ShowDataGraph()
-
-if len(sys.argv) > 1 and ("-product" in sys.argv or "-product-graph" in sys.argv):
-    ShowProductGraph()
-
-if len(sys.argv) > 1 and ("-update-product" in sys.argv or "-update" in sys.argv):
-    UpdateProductInfoFromLongTerm()
-
-
-
-
-
+if __name__ == "__main__":
+    # -cprofile adds a deep cProfile dump on top of the per-run JSON profile
+    if "-cprofile" in sys.argv:
+        RunProfile.start_cprofile()
+    if len(sys.argv) > 1 and sys.argv.__contains__("-clear"):
+        if(ClearData() == 0):
+            print("Data cleared.")
+            sys.exit()
+
+    with RunProfile.phase("load"):
+        LoadDataFromFile()
+    with RunProfile.phase("collect"):
+        # -per-list keeps the original one-request-per-list collection for comparison
+        # -incremental reads only new board actions since the last run
+        collected = CollectData(snapshot="-per-list" not in sys.argv, incremental="-incremental" in sys.argv)
+    if not collected:
+        RunProfile.write_profile()
+        RunProfile.stop_cprofile()
+        sys.exit(1)
+    with RunProfile.phase("save"):
+        SaveDataToFile()
+
+    # Always update product info based on Long Term.txt after collecting data
+    with RunProfile.phase("update"):
+        UpdateProductInfoFromLongTerm()
+
+    if len(sys.argv) > 1 and sys.argv.__contains__("-graph"):
+        ShowDataGraph()
+
+    if "-headings" in sys.argv:
+        ShowHeadingGraph()
+
+    if len(sys.argv) > 1 and ("-product" in sys.argv or "-product-graph" in sys.argv):
+        ShowProductGraph()
+
+    if len(sys.argv) > 1 and ("-update-product" in sys.argv or "-update" in sys.argv):
+        with RunProfile.phase("update"):
+            UpdateProductInfoFromLongTerm()
+
+    # headless: write chart images for every series, skipping unchanged ones
+    if "-render" in sys.argv:
+        with RunProfile.phase("render"):
+            RenderCharts.render_all()
+
+    RunProfile.write_profile()
+    if "-cprofile" in sys.argv:
+        RunProfile.stop_cprofile()
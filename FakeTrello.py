@@ -0,0 +1,391 @@
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Offline stand-in for the Trello REST endpoints used by the scripts in this repo.
+# Serves a generated board over http://127.0.0.1:<port>/1 with configurable size,
+# per-request latency and injected 429 responses, so the collectors can be run,
+# measured and regression-tested without a live board.
+#
+#   python FakeTrello.py --cards 10000 --lists 20 --latency 0.05 --port 8765
+#   then set TRELLO_BASE_URL=http://127.0.0.1:8765/1 in .env
+
+ROUTE_WORDS = {"boards", "lists", "cards", "labels", "idLabels", "actions"}
+HOUR_LABELS = [("1", "green"), ("2", "yellow"), ("4", "orange"), ("8", "red")]
+HEADING_NAMES = ["Set up program to run on webserver", "Set up Node.js", "Connect with React",
+                 "Database", "Authentication", "Deployment"]
+
+
+class FakeBoard:
+    """In-memory board: lists, labels and cards with full Trello-like payloads."""
+
+    def __init__(self, board_id="fakeboard", num_cards=100, num_lists=10, seed=0, history_days=0):
+        rng = random.Random(seed)
+        self.board_id = board_id
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.lists = []
+        for i in range(num_lists):
+            if i == num_lists - 1:
+                name = "Done"
+            elif i % 3 == 0:
+                name = f"sp {i // 3 + 1}"
+            else:
+                name = f"Backlog {i}"
+            self.lists.append({"id": self._new_id(), "name": name, "closed": False,
+                               "idBoard": board_id, "pos": (i + 1) * 65536})
+        self.labels = []
+        for name, color in HOUR_LABELS:
+            self._add_label(name, color)
+        for name in HEADING_NAMES:
+            self._add_label(name, "blue")
+        self.cards = {}
+        self.actions = []
+        for i in range(num_cards):
+            lst = self.lists[rng.randrange(num_lists)] if self.lists else {"id": None}
+            label_ids = [self.labels[rng.randrange(len(HOUR_LABELS))]["id"]]
+            if rng.random() < 0.5:
+                label_ids.append(self.labels[len(HOUR_LABELS) + rng.randrange(len(HEADING_NAMES))]["id"])
+            self._add_card(f"Card {i}", lst["id"], label_ids, (i + 1) * 65536)
+        if history_days:
+            self._generate_history(rng, history_days)
+
+    def _generate_history(self, rng, days):
+        """
+        Record the generated board as an action history: everything is created
+        `days` days ago, then on most days a few sprint cards move to Done.
+        """
+        start = datetime.now(timezone.utc).replace(hour=9, minute=0, second=0, microsecond=0) - timedelta(days=days)
+        stamp = start.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        names = {lst["id"]: lst["name"] for lst in self.lists}
+        for lst in self.lists:
+            self._record("createList", {"list": {"id": lst["id"], "name": lst["name"]}}, stamp)
+        for label in self.labels:
+            self._record("createLabel", {"label": {"id": label["id"], "name": label["name"],
+                                                   "color": label["color"]}}, stamp)
+        for card in self.cards.values():
+            # labels given at creation are not part of Trello's createCard payload
+            self._record("createCard", {"card": {"id": card["id"], "name": card["name"]},
+                                        "list": {"id": card["idList"], "name": names[card["idList"]]}}, stamp)
+        done = self.lists[-1]
+        for day in range(1, days + 1):
+            if rng.random() < 0.25:
+                continue  # nobody touched the board that day
+            stamp = (start + timedelta(days=day, hours=rng.randrange(8))).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            sprint_cards = [c for c in self.cards.values() if names[c["idList"]].startswith("sp ")]
+            for card in rng.sample(sprint_cards, min(len(sprint_cards), rng.randrange(1, 6))):
+                old = card["idList"]
+                card["idList"] = done["id"]
+                self._record("updateCard", {"card": {"id": card["id"], "idList": done["id"]},
+                                            "listBefore": {"id": old, "name": names[old]},
+                                            "listAfter": {"id": done["id"], "name": done["name"]}}, stamp)
+
+    def _new_id(self):
+        self.next_id += 1
+        return f"{self.next_id:024x}"
+
+    def _add_label(self, name, color):
+        label = {"id": self._new_id(), "idBoard": self.board_id, "name": name, "color": color}
+        self.labels.append(label)
+        return label
+
+    def _add_card(self, name, list_id, label_ids, pos):
+        by_id = {label["id"]: label for label in self.labels}
+        card = {
+            "id": self._new_id(),
+            "name": name,
+            "desc": "Generated card used by the offline Trello stand-in. " * 4,
+            "closed": False,
+            "idBoard": self.board_id,
+            "idList": list_id,
+            "idLabels": [i for i in label_ids if i in by_id],
+            "labels": [by_id[i] for i in label_ids if i in by_id],
+            "pos": pos,
+            "due": None,
+            "dateLastActivity": "2025-11-01T12:00:00.000Z",
+            "shortUrl": "https://trello.com/c/fake",
+            "badges": {"votes": 0, "comments": 0, "attachments": 0, "checkItems": 0,
+                       "checkItemsChecked": 0, "description": True},
+        }
+        self.cards[card["id"]] = card
+        return card
+
+    def _list_ref(self, list_id):
+        """{id, name} of a list, as Trello embeds it in action payloads."""
+        return {"id": list_id, "name": next((l["name"] for l in self.lists if l["id"] == list_id), "")}
+
+    def _record(self, kind, data, date="2025-11-01T12:00:00.000Z"):
+        self.actions.append({"id": self._new_id(), "type": kind, "date": date,
+                             "idMemberCreator": "fakemember", "data": data})
+
+    def create_label(self, name, color):
+        with self.lock:
+            label = self._add_label(name, color)
+            self._record("createLabel", {"label": {"id": label["id"], "name": name, "color": color}})
+            return label
+
+    def create_card(self, list_id, name, label_ids, pos):
+        with self.lock:
+            if pos is None:
+                pos = max((c["pos"] for c in self.cards.values() if c["idList"] == list_id), default=0) + 65536
+            card = self._add_card(name, list_id, label_ids, float(pos))
+            # like Trello, the action does not list the labels the card was created with
+            self._record("createCard", {"card": {"id": card["id"], "name": name},
+                                        "list": self._list_ref(list_id)})
+            return card
+
+    def move_card(self, card_id, list_id):
+        with self.lock:
+            card = self.cards[card_id]
+            old = card["idList"]
+            card["idList"] = list_id
+            self._record("updateCard", {"card": {"id": card_id, "idList": list_id},
+                                        "listBefore": self._list_ref(old), "listAfter": self._list_ref(list_id)})
+
+    def archive_card(self, card_id):
+        with self.lock:
+            card = self.cards.pop(card_id)
+            self._record("updateCard", {"card": {"id": card_id, "closed": True},
+                                        "old": {"closed": False}, "list": {"id": card["idList"]}})
+
+    def list_actions(self, since=None, before=None, limit=50, kinds=None):
+        """Newest first, like Trello. since/before are exclusive action ids."""
+        with self.lock:
+            actions = list(self.actions)
+        result = []
+        for action in reversed(actions):
+            if since and action["id"] <= since:
+                break
+            if before and action["id"] >= before:
+                continue
+            if kinds and action["type"] not in kinds:
+                continue
+            result.append(action)
+            if len(result) >= limit:
+                break
+        return result
+
+    def add_card_label(self, card_id, label_id):
+        with self.lock:
+            card = self.cards.get(card_id)
+            label = next((l for l in self.labels if l["id"] == label_id), None)
+            if card is None or label is None:
+                return None
+            if label_id not in card["idLabels"]:
+                card["idLabels"].append(label_id)
+                card["labels"].append(label)
+                self._record("addLabelToCard", {"card": {"id": card_id, "name": card["name"]},
+                                                "label": {"id": label_id, "name": label["name"]}})
+            return card["idLabels"]
+
+    def remove_card_label(self, card_id, label_id):
+        with self.lock:
+            card = self.cards.get(card_id)
+            if card is None or label_id not in card["idLabels"]:
+                return None
+            card["idLabels"].remove(label_id)
+            card["labels"] = [l for l in card["labels"] if l["id"] != label_id]
+            self._record("removeLabelFromCard", {"card": {"id": card_id, "name": card["name"]},
+                                                 "label": {"id": label_id}})
+            return card["idLabels"]
+
+    def list_cards(self, list_id=None):
+        with self.lock:
+            cards = [c for c in self.cards.values() if list_id is None or c["idList"] == list_id]
+        return sorted(cards, key=lambda c: c["pos"])
+
+    def page_cards(self, limit, before=None, since=None):
+        """Board cards newest first, like Trello's paginated cards. since/before are exclusive card ids."""
+        with self.lock:
+            cards = [c for c in self.cards.values()
+                     if (not before or c["id"] < before) and (not since or c["id"] > since)]
+        return sorted(cards, key=lambda c: c["id"], reverse=True)[:limit]
+
+
+def _project(obj, fields):
+    if not fields or fields == "all":
+        return obj
+    keep = set(fields.split(",")) | {"id"}
+    return {k: v for k, v in obj.items() if k in keep}
+
+
+class FakeTrelloServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, board, latency=0.0, error_429_every=0):
+        super().__init__(address, FakeTrelloHandler)
+        self.board = board
+        self.latency = latency
+        self.error_429_every = error_429_every
+        self.request_log = Counter()
+        self.bytes_sent = 0
+        self.counter_lock = threading.Lock()
+        self.total_requests = 0
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/1"
+
+
+class FakeTrelloHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode() if not isinstance(payload, bytes) else payload
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.counter_lock:
+            self.server.bytes_sent += len(body)
+
+    def _handle(self, method):
+        server = self.server
+        parsed = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length)
+            query.update({k: v[-1] for k, v in parse_qs(body.decode()).items()})
+        path = parsed.path[2:] if parsed.path.startswith("/1/") else parsed.path
+        endpoint = "/".join(seg if seg in ROUTE_WORDS or not seg else "{id}" for seg in path.split("/"))
+        with server.counter_lock:
+            server.total_requests += 1
+            server.request_log[f"{method} {endpoint}"] += 1
+            throttled = server.error_429_every and server.total_requests % server.error_429_every == 0
+        if server.latency:
+            time.sleep(server.latency)
+        if throttled:
+            self._send(429, {"error": "API_TOKEN_LIMIT_EXCEEDED"}, {"Retry-After": "0.01"})
+            return
+        status, payload = route(server.board, method, path, query)
+        if method == "GET" and status == 200:
+            # ETag validators so conditional requests can be answered with 304
+            body = json.dumps(payload).encode()
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", {"ETag": etag})
+            else:
+                self._send(status, body, {"ETag": etag})
+            return
+        self._send(status, payload)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+def route(board, method, path, query):
+    """Dispatch one request against the board. Returns (status, payload)."""
+    m = re.fullmatch(r"/boards/([^/]+)/actions", path)
+    if m and method == "GET":
+        kinds = set(query["filter"].split(",")) if query.get("filter") and query["filter"] != "all" else None
+        actions = board.list_actions(query.get("since"), query.get("before"), int(query.get("limit", 50)), kinds)
+        return 200, [_project(a, query.get("fields")) for a in actions]
+    m = re.fullmatch(r"/boards/([^/]+)/(lists|cards|labels)", path)
+    if m and method == "GET":
+        if m.group(1) != board.board_id:
+            return 404, {"message": "board not found"}
+        kind = m.group(2)
+        if kind == "lists":
+            result = []
+            nested = query.get("cards") in ("open", "all", "visible")
+            cards_by_list = {}
+            if nested:
+                for card in board.list_cards():
+                    cards_by_list.setdefault(card["idList"], []).append(card)
+            for lst in board.lists:
+                item = _project(lst, query.get("fields"))
+                if nested:
+                    item["cards"] = [_project(c, query.get("card_fields")) for c in cards_by_list.get(lst["id"], [])]
+                result.append(item)
+            return 200, result
+        if kind == "labels":
+            return 200, [_project(label, query.get("fields")) for label in board.labels]
+        if "limit" in query:
+            cards = board.page_cards(int(query["limit"]), query.get("before"), query.get("since"))
+        else:
+            cards = board.list_cards()
+        return 200, [_project(c, query.get("fields")) for c in cards]
+    m = re.fullmatch(r"/cards/([^/]+)", path)
+    if m and method == "GET":
+        card = board.cards.get(m.group(1))
+        if card is None:
+            return 404, {"message": "The requested resource was not found."}
+        return 200, _project(card, query.get("fields"))
+    m = re.fullmatch(r"/lists/([^/]+)/cards", path)
+    if m and method == "GET":
+        return 200, [_project(c, query.get("fields")) for c in board.list_cards(m.group(1))]
+    if path == "/labels" and method == "POST":
+        return 200, board.create_label(query.get("name", ""), query.get("color"))
+    if path == "/cards" and method == "POST":
+        label_ids = [i for i in query.get("idLabels", "").split(",") if i]
+        card = board.create_card(query.get("idList"), query.get("name", ""), label_ids, query.get("pos"))
+        return 200, card
+    m = re.fullmatch(r"/cards/([^/]+)/idLabels", path)
+    if m and method == "POST":
+        result = board.add_card_label(m.group(1), query.get("value"))
+        if result is None:
+            return 400, {"message": "invalid value for value"}
+        return 200, result
+    m = re.fullmatch(r"/cards/([^/]+)/idLabels/([^/]+)", path)
+    if m and method == "DELETE":
+        result = board.remove_card_label(m.group(1), m.group(2))
+        if result is None:
+            return 404, {"message": "The requested resource was not found."}
+        return 200, result
+    return 404, {"message": f"no fake route for {method} {path}"}
+
+
+def start_fake_trello(num_cards=100, num_lists=10, latency=0.0, error_429_every=0, port=0, board_id="fakeboard",
+                      history_days=0):
+    """Start a fake Trello server on a background thread and return it (see .base_url)."""
+    board = FakeBoard(board_id, num_cards, num_lists, history_days=history_days)
+    server = FakeTrelloServer(("127.0.0.1", port), board, latency, error_429_every)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run an offline Trello stand-in")
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--lists", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--error-429-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--board-id", default="fakeboard")
+    parser.add_argument("--history-days", type=int, default=0,
+                        help="also serve an action history covering this many days (for backfill)")
+    args = parser.parse_args()
+    server = start_fake_trello(args.cards, args.lists, args.latency, args.error_429_every, args.port, args.board_id,
+                               args.history_days)
+    print(f"Fake Trello serving board '{args.board_id}' at {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
@@ -0,0 +1,97 @@
+import json
+import os
+
+# Per-heading burndown, stored column by column.
+# Headings.json keeps one shared date axis and one column per heading:
+#
+#   {"dates": ["2025-11-03", ...],
+#    "columns": {"Set up program to run on webserver": {"start": 0, "values": [12, 9, ...]}, ...}}
+#
+# A column starts at the first date its heading was seen and ends at the last,
+# so new headings do not backfill zeros for the days before they existed and a
+# finished heading stops growing. Dates missing from a column read as 0.
+
+HEADINGS_FILE = "Headings.json"
+
+
+def empty_table():
+    return {"dates": [], "columns": {}}
+
+
+def load(path=HEADINGS_FILE):
+    if not os.path.exists(path):
+        return empty_table()
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable heading file {path}: {e}")
+        return empty_table()
+
+
+def save(table, path=HEADINGS_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(table, f, separators=(",", ":"), sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def _set(column, index, value):
+    """Put value at date index `index`, padding with zeros up to it. Returns False if it is before the column."""
+    end = column["start"] + len(column["values"])
+    if index < column["start"]:
+        return False
+    if index < end:
+        column["values"][index - column["start"]] = value
+    else:
+        column["values"].extend([0] * (index - end))
+        column["values"].append(value)
+    return True
+
+
+def _clear(column, index):
+    """Remove the heading from date index `index` (a re-run where it no longer appears)."""
+    last = column["start"] + len(column["values"]) - 1
+    if index == last:
+        column["values"].pop()
+    elif column["start"] <= index < last:
+        column["values"][index - column["start"]] = 0
+
+
+def record(table, date_str, headings):
+    """
+    Store {heading: hours} for date_str. Re-running on the last date replaces
+    it; dates before the last one that are not in the table are skipped.
+    """
+    dates = table["dates"]
+    if dates and date_str < dates[-1] and date_str not in dates:
+        print(f"Heading breakdown for {date_str} is older than {dates[-1]}, not recorded")
+        return False
+    if not dates or date_str > dates[-1]:
+        dates.append(date_str)
+    index = dates.index(date_str)
+    columns = table["columns"]
+    for name, column in list(columns.items()):
+        if name not in headings:
+            _clear(column, index)
+            if not column["values"]:
+                del columns[name]
+    for name, hours in headings.items():
+        column = columns.setdefault(name, {"start": index, "values": []})
+        if not _set(column, index, hours):
+            print(f"Heading {name!r} starts after {date_str}, not recorded")
+    return True
+
+
+def frame(table):
+    """Dense view for plotting: (dates, names, rows) with rows[i][j] = hours of names[i] on dates[j]."""
+    dates = table["dates"]
+    names = sorted(table["columns"], key=lambda n: table["columns"][n]["start"])
+    rows = []
+    for name in names:
+        column = table["columns"][name]
+        row = [0] * len(dates)
+        row[column["start"]:column["start"] + len(column["values"])] = column["values"]
+        rows.append(row)
+    return dates, names, rows
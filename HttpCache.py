@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import RunProfile
+
+# Response cache for Trello GET requests, used by TrelloClient.request().
+# Entries live in a bounded in-memory LRU backed by one JSON file per entry in
+# .trello_cache/ (also LRU-bounded, by file mtime), so later requests in the
+# same run and later runs both benefit.
+#
+# Each endpoint has a TTL (ENDPOINT_TTLS, keyed like RunProfile's endpoint
+# templates). Within its TTL an entry is served without a request. After that,
+# if the response carried an ETag or Last-Modified, the request is sent as a
+# conditional one and a 304 reuses the cached body. Any successful write
+# (POST/PUT/DELETE) clears the cache so nothing stale is read back after it.
+# Streamed responses (TrelloClient.iter_json) are never cached, and reads that
+# must see the board as it is now (ActionsFeed.full_scan) pass fresh=True to
+# TrelloClient.get, which skips the TTL but still revalidates.
+#
+# Set TRELLO_CACHE=0 in .env to turn it off; TRELLO_CACHE_DIR moves it.
+
+CACHE_DIR = ".trello_cache"
+MAX_MEMORY_ENTRIES = 256
+MAX_DISK_ENTRIES = 1024
+DEFAULT_TTL = 0  # seconds; 0 = only reused after a successful revalidation
+ENDPOINT_TTLS = {
+    "GET /boards/{id}/lists": 300,
+    "GET /boards/{id}/labels": 300,
+    "GET /lists/{id}": 300,
+}
+HIT, REVALIDATED, MISS, STORE, EVICT = "hit", "revalidated", "miss", "store", "evict"
+
+
+class CachedResponse:
+    """The parts of a requests.Response the scripts use, rebuilt from a cache entry."""
+
+    from_cache = True
+
+    def __init__(self, entry):
+        self.status_code = entry["status"]
+        self.text = entry["body"]
+        self.content = self.text.encode()
+        self.headers = {"Content-Type": entry.get("content_type") or "application/json"}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class HttpCache:
+    def __init__(self, directory=CACHE_DIR, max_memory=MAX_MEMORY_ENTRIES, max_disk=MAX_DISK_ENTRIES,
+                 ttls=None, default_ttl=DEFAULT_TTL):
+        self.directory = directory
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def count(self, event):
+        # hit/miss statistics are part of the run profile printed at the end of a run
+        RunProfile.record_cache(event)
+
+    def key(self, path, params, identity=""):
+        """Cache key for a GET: path, sorted params and a hash of the credentials it was read with."""
+        query = sorted((k, str(v)) for k, v in (params or {}).items())
+        raw = json.dumps([identity, path, query])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def ttl(self, endpoint):
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def _disk_path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def lookup(self, key):
+        """The entry for key (memory first, then disk), or None."""
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+        if entry is None and self.directory:
+            try:
+                with open(self._disk_path(key), "r") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._remember(key, entry)
+        if entry is not None and self.directory:
+            # file mtime is the on-disk LRU order
+            try:
+                os.utime(self._disk_path(key))
+            except OSError:
+                pass
+        return entry
+
+    def is_fresh(self, entry, endpoint):
+        return time.time() - entry["stored"] < self.ttl(endpoint)
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _remember(self, key, entry):
+        with self.lock:
+            self.memory[key] = entry
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_memory:
+                self.memory.popitem(last=False)
+
+    def _write_disk(self, key, entry):
+        if not self.directory:
+            return
+        path = self._disk_path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+        if len(names) <= self.max_disk:
+            return
+        paths = sorted((os.path.join(self.directory, n) for n in names), key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_disk]:
+            try:
+                os.remove(path)
+                self.count(EVICT)
+            except OSError:
+                pass
+
+    def store(self, key, endpoint, response):
+        """Keep a 200 response if it can be reused: it has a TTL or a validator."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (self.ttl(endpoint) > 0 or etag or last_modified):
+            return
+        entry = {"stored": time.time(), "status": 200, "etag": etag, "last_modified": last_modified,
+                 "content_type": response.headers.get("Content-Type"), "body": response.text}
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+        self.count(STORE)
+
+    def refresh(self, key, entry):
+        """A 304 confirmed the entry; restart its TTL."""
+        entry["stored"] = time.time()
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+        if self.directory and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
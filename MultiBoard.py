@@ -0,0 +1,86 @@
+import argparse
+import json
+from datetime import datetime
+
+import TrelloClient
+import BoardAggregate
+import SeriesStore
+import Snapshots
+
+# Collection for several boards (teams) in one process.
+# boards.json lists the boards, each with its own series file and, optionally,
+# its own list rules (see BoardAggregate.aggregate):
+#
+#   {"rollup": "Portfolio.txt",
+#    "boards": [
+#      {"name": "Web", "id": "5f1...", "series": "Web Long Term.txt"},
+#      {"name": "Mobile", "id": "61a...", "series": "Mobile Long Term.txt",
+#       "rules": {"sprint_prefix": "sprint ", "finished_words": ["shipped", "done"]}}]}
+#
+# Boards are collected concurrently over TrelloClient's shared pool, session and
+# rate limits. Each board's sprint total is written to its own series and the
+# sum to the rollup series. A board that fails is reported and keeps its last
+# recorded value in the rollup; it never stops the others.
+#
+#   python MultiBoard.py [--config boards.json]
+
+CONFIG_FILE = "boards.json"
+ROLLUP_FILE = "Portfolio.txt"
+
+
+def load_config(path=CONFIG_FILE):
+    with open(path, "r") as f:
+        config = json.load(f)
+    boards = config.get("boards", [])
+    for board in boards:
+        if not board.get("id"):
+            raise ValueError(f"Board entry without an id in {path}: {board}")
+        board.setdefault("name", board["id"])
+        board.setdefault("series", f"{board['name']} Long Term.txt")
+    config.setdefault("rollup", ROLLUP_FILE)
+    return config
+
+
+def collect_board(board):
+    """Totals for one board, or an error string. Never raises."""
+    try:
+        return {"board": board, "totals": BoardAggregate.collect(board["id"], board.get("rules")), "error": None}
+    except Exception as e:
+        return {"board": board, "totals": None, "error": f"{type(e).__name__}: {e}"}
+
+
+def _last_value(path):
+    entries, _ = SeriesStore.read_series(path)
+    return entries[-1][1] if entries else None
+
+
+def collect_all(config, date_str=None):
+    """Collect every board concurrently, write each series and the rollup. Returns the per-board results."""
+    date_str = date_str or datetime.now().strftime("%Y-%m-%d")
+    results = TrelloClient.map_concurrent(collect_board, config["boards"])
+    rollup = 0
+    failed = 0
+    for result in results:
+        board = result["board"]
+        if result["error"] is None:
+            sprint = result["totals"]["sprint"]
+            SeriesStore.set_value(board["series"], date_str, sprint, date_str)
+            Snapshots.record(board["series"], sprint)
+            print(f"{board['name']}: sprint {sprint}, product {result['totals']['product']} -> {board['series']}")
+        else:
+            failed += 1
+            sprint = _last_value(board["series"])
+            print(f"{board['name']}: FAILED ({result['error']}); "
+                  f"rollup uses last recorded value {sprint if sprint is not None else 'none'}")
+        rollup += sprint or 0
+    SeriesStore.set_value(config["rollup"], date_str, rollup, date_str)
+    Snapshots.record(config["rollup"], rollup)
+    print(f"Portfolio: {rollup} across {len(results)} board(s), {failed} failed -> {config['rollup']}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect every board listed in a config file")
+    parser.add_argument("--config", default=CONFIG_FILE)
+    args = parser.parse_args()
+    collect_all(load_config(args.config))
@@ -0,0 +1,328 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+import SeriesStore
+import Snapshots
+import HeadingSeries
+
+# Headless chart rendering for the daily job.
+# Writes PNG/SVG files for Long Term, every Sprint file and ProductInfo using the
+# Agg backend. A hash of each chart's input series is kept in charts/.hashes.json
+# and a chart is only redrawn when its data (or its styling version) changed, so
+# unchanged charts cost a file stat and a hash. matplotlib is only imported when
+# something actually needs drawing.
+#
+# Charts that need drawing are spread over a process pool (matplotlib holds the
+# GIL), one series per worker, plus a combined overlay of every series. Results
+# are collected in job order so the output does not depend on worker scheduling.
+# The per-heading breakdown (Headings.json) is drawn as a stacked area chart.
+#
+#   python RenderCharts.py [--formats png svg] [--out charts] [--force] [--workers N]
+
+CHART_DIR = "charts"
+HASH_FILE = ".hashes.json"
+RENDER_VERSION = 2  # bump when chart styling changes so every chart is redrawn
+SPRINT_END_DATE = datetime(2025, 12, 8)  # fixed recommended target for Long Term
+PRODUCT_TARGET = (12, 9)  # month, day of the product backlog target
+
+
+def parse_dated(entries):
+    """Sort (dateStr, value) rows and parse the dates (or snapshot timestamps), skipping invalid ones."""
+    dates = []
+    values = []
+    for dateStr, value in sorted(entries, key=lambda e: e[0]):
+        try:
+            if "T" in dateStr:
+                dates.append(datetime.fromisoformat(dateStr))
+            else:
+                dates.append(datetime.strptime(dateStr, '%Y-%m-%d'))
+            values.append(value)
+        except ValueError:
+            print(f"Skipping invalid date: {dateStr}")
+    return dates, values
+
+
+def daily_entries(entries):
+    """Last value of each day, for rows that may be intraday snapshots."""
+    days = {}
+    for dateStr, value in sorted(entries, key=lambda e: e[0]):
+        days[dateStr[:10]] = value
+    return list(days.items())
+
+
+def product_target_date(first_date):
+    # recommended straight line target Dec 9, pushed to next year if already past
+    target_date = datetime(first_date.year, *PRODUCT_TARGET)
+    if target_date <= first_date:
+        target_date = datetime(first_date.year + 1, *PRODUCT_TARGET)
+    return target_date
+
+
+def forecast_for(entries):
+    """Velocity forecast for a series, or None when it cannot be computed."""
+    try:
+        import Velocity
+    except ImportError:
+        return None
+    return Velocity.analyze(daily_entries(entries))
+
+
+def draw_forecast(plt, forecast):
+    """
+    Least-squares projection to the completion date with its confidence band.
+    Returns the last date drawn, or None if the series is not burning down.
+    """
+    if not forecast or forecast["completion"] is None:
+        return None
+    end = forecast["completion_late"] or forecast["completion"]
+    keep = [i for i, d in enumerate(forecast["band_dates"]) if d <= end]
+    dates = [forecast["band_dates"][i] for i in keep]
+    plt.fill_between(dates, [forecast["band_low"][i] for i in keep], [forecast["band_high"][i] for i in keep],
+                     color='orange', alpha=0.2, label='95% band')
+    plt.plot(dates, [max(forecast["fit"][i], 0) for i in keep], linestyle=':', color='orange',
+             label=f"Forecast ({forecast['completion']:%Y-%m-%d}, {forecast['velocity']:.1f}/day)")
+    return end
+
+
+def draw_burndown(plt, dates, values, title='Burn Down Chart', end_date=None, ylabel='Cards Left to Do',
+                  forecast=None):
+    """Actual line, a straight recommended line from the first value to end_date and the forecast."""
+    fig = plt.figure(figsize=(10, 5))
+    plt.plot(dates, values, marker='o', label='Actual')
+    forecast_end = draw_forecast(plt, forecast)
+    if end_date is not None and len(dates) > 1:
+        plt.plot([dates[0], end_date], [values[0], 0], linestyle='--', color='red', label='Recommended')
+        try:
+            plt.xlim(dates[0], max(end_date, forecast_end or end_date))
+        except Exception:
+            pass
+    plt.xlabel('Date')
+    plt.ylabel(ylabel)
+    plt.title(title)
+    plt.grid(True)
+    plt.xticks(rotation=45)
+    plt.ylim(0, max(values) + 2)
+    plt.legend()
+    plt.tight_layout()
+    return fig
+
+
+def draw_product(plt, dates, values, title='Product Backlog', forecast=None):
+    """Product backlog line with the recommended line to the yearly target date and the forecast."""
+    fig = plt.figure(figsize=(10, 5))
+    plt.plot(dates, values, marker='o', label='Product Backlog')
+    draw_forecast(plt, forecast)
+    plt.plot([dates[0], product_target_date(dates[0])], [values[0], 0],
+             linestyle='--', color='red', label='Recommended')
+    plt.xlabel('Date')
+    plt.ylabel('Product Backlog')
+    plt.title(title)
+    plt.grid(True)
+    plt.xticks(rotation=45)
+    plt.ylim(0, max(values) + 2)
+    plt.legend()
+    plt.tight_layout()
+    return fig
+
+
+def draw_overlay(plt, named_series, title='All Series'):
+    """Every series on one set of axes, one line per series."""
+    fig = plt.figure(figsize=(12, 6))
+    top = 0
+    for name, dates, values in named_series:
+        plt.plot(dates, values, marker='.', label=name)
+        top = max(top, max(values))
+    plt.xlabel('Date')
+    plt.ylabel('Remaining')
+    plt.title(title)
+    plt.grid(True)
+    plt.xticks(rotation=45)
+    plt.ylim(0, top + 2)
+    plt.legend()
+    plt.tight_layout()
+    return fig
+
+
+def draw_stacked(plt, dates, names, rows, title='Burn Down by Heading'):
+    """Stacked area of the remaining hours per heading; the top edge is the sprint total."""
+    fig = plt.figure(figsize=(12, 6))
+    plt.stackplot(dates, rows, labels=names, alpha=0.85)
+    plt.xlabel('Date')
+    plt.ylabel('Hours Left to Do')
+    plt.title(title)
+    plt.grid(True)
+    plt.xticks(rotation=45)
+    plt.ylim(0, max((sum(col) for col in zip(*rows)), default=0) + 2)
+    plt.legend(loc='upper right', fontsize='small')
+    plt.tight_layout()
+    return fig
+
+
+def chart_jobs():
+    """Every chart the batch renderer knows how to draw, in a fixed order."""
+    jobs = [{"name": "Long Term", "path": "Long Term.txt", "kind": "burndown",
+             "title": "Burn Down Chart", "end_date": SPRINT_END_DATE, "tiered": True}]
+    for path in sorted(glob.glob("Sprint* BurnDownChart*")):
+        name = os.path.splitext(os.path.basename(path))[0]
+        jobs.append({"name": name, "path": path, "kind": "burndown", "title": name, "end_date": None})
+    jobs.append({"name": "ProductInfo", "path": "ProductInfo.txt", "kind": "product",
+                 "title": "Product Backlog", "end_date": None})
+    jobs.append({"name": "Headings", "path": HeadingSeries.HEADINGS_FILE, "kind": "stacked",
+                 "title": "Burn Down by Heading", "end_date": None})
+    return jobs
+
+
+def series_hash(job, entries, start_date, formats):
+    payload = [RENDER_VERSION, job["kind"], job["title"], str(job["end_date"]),
+               list(formats), [list(e) for e in entries], start_date]
+    return hashlib.sha256(json.dumps(payload).encode()).hexdigest()
+
+
+def output_paths(job, out_dir, formats):
+    base = job["name"].replace(" ", "_")
+    return [os.path.join(out_dir, f"{base}.{fmt}") for fmt in formats]
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    # stable SVG ids so identical data produces identical files
+    plt.rcParams["svg.hashsalt"] = "burndown"
+    return plt
+
+
+def save_figure(plt, fig, paths):
+    for path in paths:
+        metadata = {"Date": None} if path.endswith(".svg") else None
+        fig.savefig(path, metadata=metadata)
+    plt.close(fig)
+
+
+def render_job(job, entries, paths):
+    """Draw one chart and write it in every requested format. Returns False if there is no data."""
+    if job["kind"] == "stacked":
+        dates, names, rows = entries
+        if not dates:
+            return False
+        plt = _pyplot()
+        days = [datetime.strptime(d, '%Y-%m-%d') for d in dates]
+        save_figure(plt, draw_stacked(plt, days, names, rows, job["title"]), paths)
+        return True
+    if job["kind"] == "overlay":
+        named_series = []
+        for name, series_entries in entries:
+            dates, values = parse_dated(series_entries)
+            if dates:
+                named_series.append((name, dates, values))
+        if not named_series:
+            return False
+        plt = _pyplot()
+        save_figure(plt, draw_overlay(plt, named_series, job["title"]), paths)
+        return True
+    dates, values = parse_dated(entries)
+    if not dates:
+        print(f"No data to plot for {job['name']}")
+        return False
+    plt = _pyplot()
+    forecast = forecast_for(entries)
+    if job["kind"] == "product":
+        fig = draw_product(plt, dates, values, job["title"], forecast)
+    else:
+        fig = draw_burndown(plt, dates, values, job["title"], job["end_date"], forecast=forecast)
+    save_figure(plt, fig, paths)
+    return True
+
+
+def load_hashes(out_dir):
+    path = os.path.join(out_dir, HASH_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_hashes(out_dir, hashes):
+    with open(os.path.join(out_dir, HASH_FILE), "w") as f:
+        json.dump(hashes, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _timed_render(job, entries, paths):
+    """Process-pool entry point: render one chart and report how long it took."""
+    start = time.perf_counter()
+    ok = render_job(job, entries, paths)
+    return ok, time.perf_counter() - start
+
+
+def _run_jobs(pending, workers):
+    if workers <= 1 or len(pending) <= 1:
+        return [_timed_render(job, entries, paths) for job, entries, paths, _ in pending]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+        futures = [pool.submit(_timed_render, job, entries, paths) for job, entries, paths, _ in pending]
+        # collected in submission order, never completion order
+        return [f.result() for f in futures]
+
+
+def render_all(out_dir=CHART_DIR, formats=("png",), force=False, workers=1):
+    """
+    Render every chart whose data changed since the last run, plus the overlay
+    of all series. Returns the list of rendered names.
+    """
+    started = time.perf_counter()
+    os.makedirs(out_dir, exist_ok=True)
+    hashes = load_hashes(out_dir)
+    pending = []
+    all_series = []
+    jobs = chart_jobs()
+    for job in jobs:
+        if not os.path.exists(job["path"]):
+            continue
+        if job["kind"] == "stacked":
+            entries, start_date = list(HeadingSeries.frame(HeadingSeries.load(job["path"]))), None
+        else:
+            entries, start_date = SeriesStore.read_series(job["path"])
+            all_series.append((job["name"], entries))
+            if job.get("tiered"):
+                # intraday points for a short (e.g. new sprint) series, daily ones otherwise
+                entries = Snapshots.load(job["path"])
+        pending.append((job, entries, output_paths(job, out_dir, formats),
+                        series_hash(job, entries, start_date, formats)))
+    overlay = {"name": "Overlay", "path": None, "kind": "overlay", "title": "All Series", "end_date": None}
+    pending.append((overlay, all_series, output_paths(overlay, out_dir, formats),
+                    series_hash(overlay, all_series, None, formats)))
+    todo = []
+    for job, entries, paths, digest in pending:
+        if not force and hashes.get(job["name"]) == digest and all(os.path.exists(p) for p in paths):
+            print(f"Unchanged, skipped: {job['name']}")
+        else:
+            todo.append((job, entries, paths, digest))
+    rendered = []
+    for (job, _, paths, digest), (ok, seconds) in zip(todo, _run_jobs(todo, workers)):
+        if ok:
+            hashes[job["name"]] = digest
+            rendered.append(job["name"])
+            print(f"Rendered {job['name']} in {seconds:.2f}s: {', '.join(paths)}")
+    save_hashes(out_dir, hashes)
+    print(f"Rendered {len(rendered)} of {len(pending)} chart(s) in {time.perf_counter() - started:.2f}s")
+    return rendered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render burndown charts to image files without a display")
+    parser.add_argument("--out", default=CHART_DIR)
+    parser.add_argument("--formats", nargs="+", default=["png"], choices=["png", "svg"])
+    parser.add_argument("--force", action="store_true", help="redraw even if the data is unchanged")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes used for rendering (1 renders in this process)")
+    args = parser.parse_args()
+    render_all(args.out, tuple(args.formats), args.force, args.workers)
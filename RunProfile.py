@@ -0,0 +1,133 @@
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Per-run instrumentation.
+# TrelloClient reports every HTTP attempt here (endpoint, status, latency, bytes)
+# and the scripts wrap their phases (load, collect, save, update, render, ...)
+# in phase(). write_profile() appends one JSON line per run to run_profile.jsonl
+# with per-endpoint counts, p50/p95 latency, bytes transferred and per-phase
+# durations, so a slow nightly run can be attributed to Trello, file I/O or
+# rendering. HttpCache events are counted here too. start_cprofile()/stop_cprofile() add an optional deep profile.
+
+PROFILE_FILE = "run_profile.jsonl"
+ID_PARENTS = {"boards", "lists", "cards", "labels", "actions", "webhooks", "members", "checklists"}
+
+_lock = threading.Lock()
+_requests = {}
+_phases = []
+_cache = {}
+_started = time.perf_counter()
+_profiler = None
+
+
+def endpoint_template(method, path):
+    """GET /boards/5f1.../lists -> GET /boards/{id}/lists, so calls group by endpoint."""
+    parts = path.split("?")[0].split("/")
+    for i in range(1, len(parts)):
+        if parts[i - 1] in ID_PARENTS and parts[i]:
+            parts[i] = "{id}"
+    return f"{method} {'/'.join(parts)}"
+
+
+def record_request(method, path, status, seconds, nbytes):
+    key = endpoint_template(method, path)
+    with _lock:
+        entry = _requests.setdefault(key, {"latencies": [], "bytes": 0, "errors": 0})
+        entry["latencies"].append(seconds)
+        entry["bytes"] += nbytes
+        if status >= 400:
+            entry["errors"] += 1
+
+
+def record_cache(event):
+    """Count an HttpCache event (hit, revalidated, miss, store, evict)."""
+    with _lock:
+        _cache[event] = _cache.get(event, 0) + 1
+
+
+@contextmanager
+def phase(name):
+    """Time a block of work and record it as a named phase of the run."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _lock:
+            _phases.append((name, time.perf_counter() - start))
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summary():
+    """Everything recorded so far, as a JSON-serializable dict."""
+    with _lock:
+        endpoints = {}
+        for key, entry in sorted(_requests.items()):
+            latencies = sorted(entry["latencies"])
+            endpoints[key] = {
+                "count": len(latencies),
+                "errors": entry["errors"],
+                "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+                "total_ms": round(sum(latencies) * 1000, 2),
+                "bytes": entry["bytes"],
+            }
+        phases = {}
+        for name, seconds in _phases:
+            phases[name] = round(phases.get(name, 0) + seconds, 4)
+        cache = dict(_cache)
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "script": os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None,
+        "args": sys.argv[1:],
+        "wall_s": round(time.perf_counter() - _started, 4),
+        "phases_s": phases,
+        "requests": sum(e["count"] for e in endpoints.values()),
+        "bytes": sum(e["bytes"] for e in endpoints.values()),
+        "endpoints": endpoints,
+        "cache": cache,
+    }
+
+
+def write_profile(path=PROFILE_FILE):
+    """Append this run's summary as one JSON line and print a short digest."""
+    data = summary()
+    with open(path, "a") as f:
+        f.write(json.dumps(data) + "\n")
+    phases = ", ".join(f"{k} {v:.2f}s" for k, v in data["phases_s"].items())
+    print(f"Run profile: {data['requests']} request(s), {data['bytes']} bytes, {phases or 'no phases'} -> {path}")
+    if data["cache"]:
+        print("HTTP cache: " + ", ".join(f"{n} {k}" for k, n in sorted(data["cache"].items())))
+    return data
+
+
+def start_cprofile():
+    global _profiler
+    import cProfile
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+
+def stop_cprofile(path="run_profile.prof", top=25):
+    """Stop the deep profile, save it for snakeviz/pstats and print the hottest functions."""
+    global _profiler
+    if _profiler is None:
+        return
+    import pstats
+    _profiler.disable()
+    _profiler.dump_stats(path)
+    pstats.Stats(_profiler).sort_stats("cumulative").print_stats(top)
+    print(f"cProfile data written to {path}")
+    _profiler = None
@@ -0,0 +1,214 @@
+import os
+import sqlite3
+
+# Indexed store for the date series kept in "Long Term.txt", "ProductInfo.txt"
+# and the "SprintN BurnDownChart" files.
+#
+# The text files stay the source of truth (the daily workflow commits them), but
+# every series is mirrored into a SQLite sidecar (series.db) indexed by
+# (series, date) and by each row's byte offset in the text file. Reads come from
+# the index while the file's size and mtime match what was recorded; writes
+# compare against the stored rows, truncate the file at the first line that
+# changed and append from there, so a normal daily run rewrites one or two lines
+# instead of the whole history. The text format is unchanged byte for byte.
+
+STORE_FILE = "series.db"
+
+_connections = {}
+
+
+def open_store(path=STORE_FILE):
+    """Return a (cached) connection to the store, creating the schema if needed."""
+    key = os.path.abspath(path)
+    conn = _connections.get(key)
+    if conn is None:
+        conn = sqlite3.connect(key)
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS points (
+                series TEXT NOT NULL,
+                date TEXT NOT NULL,
+                value NUMERIC NOT NULL,
+                offset INTEGER NOT NULL,
+                PRIMARY KEY (series, date)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS points_by_offset ON points (series, offset);
+            CREATE TABLE IF NOT EXISTS series_meta (
+                series TEXT PRIMARY KEY,
+                start_date TEXT,
+                data_end INTEGER NOT NULL,
+                file_size INTEGER NOT NULL,
+                file_mtime INTEGER NOT NULL
+            );
+        """)
+        _connections[key] = conn
+    return conn
+
+
+def format_value(val):
+    """Text form used in the series files: whole floats are written as ints."""
+    if isinstance(val, float) and val.is_integer():
+        return str(int(val))
+    return str(val)
+
+
+def parse_value(text):
+    try:
+        return float(text) if "." in text else int(text)
+    except Exception:
+        return 0
+
+
+def series_key(path):
+    """Name a series is stored under: the absolute path of its text file."""
+    return os.path.abspath(path)
+
+
+def _file_stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def import_text(conn, path):
+    """(Re)index a series file from scratch: one parse of the whole file."""
+    series = series_key(path)
+    rows = []
+    start_date = None
+    data_end = None
+    offset = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            line = raw.decode().strip()
+            if line:
+                parts = line.split(",")
+                if parts[0] == "StartDate":
+                    if len(parts) > 1:
+                        start_date = parts[1]
+                    if data_end is None:
+                        data_end = offset
+                elif len(parts) > 1:
+                    rows.append((series, parts[0], parse_value(parts[1]), offset))
+            offset += len(raw)
+    if data_end is None:
+        data_end = offset
+    size, mtime = _file_stat(path)
+    with conn:
+        conn.execute("DELETE FROM points WHERE series = ?", (series,))
+        conn.executemany("INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO series_meta VALUES (?, ?, ?, ?, ?)",
+                     (series, start_date, data_end, size, mtime))
+
+
+def sync(conn, path):
+    """Make sure the index matches the file; re-import only if the file changed outside the store."""
+    series = series_key(path)
+    if not os.path.exists(path):
+        with conn:
+            conn.execute("DELETE FROM points WHERE series = ?", (series,))
+            conn.execute("DELETE FROM series_meta WHERE series = ?", (series,))
+        return False
+    row = conn.execute("SELECT file_size, file_mtime FROM series_meta WHERE series = ?", (series,)).fetchone()
+    if row is None or tuple(row) != _file_stat(path):
+        import_text(conn, path)
+    return True
+
+
+def load_range(path, start=None, end=None, store=STORE_FILE):
+    """(date, value) rows of a series file in file order, optionally limited to start <= date <= end."""
+    conn = open_store(store)
+    if not sync(conn, path):
+        return []
+    query = "SELECT date, value FROM points WHERE series = ?"
+    args = [series_key(path)]
+    if start is not None:
+        query += " AND date >= ?"
+        args.append(start)
+    if end is not None:
+        query += " AND date <= ?"
+        args.append(end)
+    query += " ORDER BY offset"
+    return [(d, v) for d, v in conn.execute(query, args)]
+
+
+def read_series(path, store=STORE_FILE):
+    """Same result as parsing the file line by line: (entries, start_date)."""
+    conn = open_store(store)
+    if not sync(conn, path):
+        return [], None
+    entries = load_range(path, store=store)
+    row = conn.execute("SELECT start_date FROM series_meta WHERE series = ?", (series_key(path),)).fetchone()
+    return entries, row[0] if row else None
+
+
+def write_series(path, entries, start_date=None, store=STORE_FILE):
+    """
+    Make the file contain `entries` in order followed by the StartDate line,
+    exactly as a full rewrite would, but only rewrite from the first line that
+    differs from what is already on disk. Returns the number of lines written.
+    """
+    conn = open_store(store)
+    series = series_key(path)
+    lines = [(d, format_value(v)) for d, v in entries]
+    exists = sync(conn, path)
+    stored = []
+    stored_start = None
+    data_end = 0
+    if exists:
+        stored = [(d, format_value(v), off) for d, v, off in conn.execute(
+            "SELECT date, value, offset FROM points WHERE series = ? ORDER BY offset", (series,))]
+        stored_start, data_end = conn.execute(
+            "SELECT start_date, data_end FROM series_meta WHERE series = ?", (series,)).fetchone()
+    # first position where the new content diverges from the file
+    first = 0
+    while first < len(lines) and first < len(stored) and lines[first] == stored[first][:2]:
+        first += 1
+    if first == len(lines) == len(stored) and stored_start == start_date:
+        return 0
+    if not exists:
+        truncate_at = 0
+    elif first < len(stored):
+        truncate_at = stored[first][2]
+    else:
+        truncate_at = data_end
+    new_rows = []
+    offset = truncate_at
+    tail = []
+    for dateStr, text in lines[first:]:
+        line = f"{dateStr},{text}\n".encode()
+        new_rows.append((series, dateStr, parse_value(text), offset))
+        tail.append(line)
+        offset += len(line)
+    new_data_end = offset
+    if start_date is not None:
+        tail.append(f"StartDate,{start_date}\n".encode())
+    with open(path, "r+b" if exists else "wb") as f:
+        f.seek(truncate_at)
+        f.truncate()
+        f.write(b"".join(tail))
+    size, mtime = _file_stat(path)
+    with conn:
+        conn.execute("DELETE FROM points WHERE series = ? AND offset >= ?", (series, truncate_at))
+        conn.executemany("INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?)", new_rows)
+        conn.execute("INSERT OR REPLACE INTO series_meta VALUES (?, ?, ?, ?, ?)",
+                     (series, start_date, new_data_end, size, mtime))
+    return len(tail)
+
+
+def set_value(path, date_str, value, start_date=None, store=STORE_FILE):
+    """
+    Set one day's value in a series file (appending the day if it is new).
+    start_date is only used when the file has none yet.
+    """
+    entries, current_start = read_series(path, store)
+    points = dict(entries)
+    points[date_str] = value
+    return write_series(path, list(points.items()), current_start or start_date, store)
+
+
+def export_text(path, out_path, store=STORE_FILE):
+    """Write a series held in the store back out in the plain text format."""
+    entries, start_date = read_series(path, store)
+    with open(out_path, "w") as f:
+        for dateStr, val in entries:
+            f.write(f"{dateStr},{format_value(val)}\n")
+        if start_date is not None:
+            f.write(f"StartDate,{start_date}\n")
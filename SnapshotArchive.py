@@ -0,0 +1,248 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+
+import TrelloClient
+import BoardAggregate
+import BoardSnapshot
+import SeriesStore
+
+# Archive of the projected board snapshots each collection run reads, so history
+# can be recomputed when the counting rules change (which lists are sprint or
+# finished lists, which labels are headings, how label names map to hours).
+#
+#   snapshot_archive/objects/ab/cdef...   zlib-compressed JSON, named by the
+#                                          sha256 of its content
+#   snapshot_archive/<board id>.jsonl     one line per run: {"taken", "manifest"}
+#
+# A run stores the board's lists and labels as one object each and its cards in
+# chunks of rows [id, idList, idLabels]. Chunk boundaries are chosen by the card
+# id (CHUNK_CARDS cards per chunk on average), not by position, so adding or
+# removing a card only changes the chunk it falls in and an unchanged chunk is
+# the same object every day; a board that did not change between two runs
+# costs one log line. The manifest object lists the run's lists, labels and
+# chunks.
+#
+# replay() recomputes the totals of every archived run with the current code and
+# the given rules, in worker processes and without any request. Each chunk is
+# tallied once (BoardAggregate.tally) and reused by every run that contains it,
+# so a run costs little more than adding up its chunks' tallies.
+#
+#   python SnapshotArchive.py replay [--board ID] [--sprint-prefix "sp "] [--write "Replayed.txt"]
+#
+# BoardAggregate.collect() archives every run; set SNAPSHOT_ARCHIVE=0 in .env
+# to turn it off and SNAPSHOT_ARCHIVE_DIR to move it.
+
+ARCHIVE_DIR = "snapshot_archive"
+CHUNK_CARDS = 16  # average cards per chunk; a power of two
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def _encode(data):
+    return json.dumps(data, separators=(",", ":"), sort_keys=True).encode()
+
+
+class SnapshotArchive:
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.written = 0  # new objects stored by this instance
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest[2:])
+
+    def _log_path(self, board_id):
+        return os.path.join(self.directory, f"{board_id}.jsonl")
+
+    def put(self, data):
+        """Store a JSON-serialisable value unless an identical one is stored already. Returns its id."""
+        raw = _encode(data)
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(raw))
+            os.replace(tmp, path)
+            with self.lock:
+                self.written += 1
+        return digest
+
+    def get(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    def record(self, board_id, lists, labels, cards, taken=None):
+        """
+        Pass `cards` (BoardSnapshot.Card records) through unchanged while
+        archiving them chunk by chunk; the run is logged once the iterator is
+        exhausted, so an interrupted collection leaves no run behind.
+        """
+        chunks = []
+        rows = []
+        count = 0
+        for card in cards:
+            rows.append([card.id, card.list_id, list(card.label_ids)])
+            count += 1
+            if zlib.crc32(card.id.encode()) & (CHUNK_CARDS - 1) == 0:
+                chunks.append(self.put(rows))
+                rows = []
+            yield card
+        if rows:
+            chunks.append(self.put(rows))
+        manifest = self.put({"lists": self.put(lists), "labels": self.put(labels), "chunks": chunks,
+                             "cards": count})
+        taken = (taken or datetime.now()).strftime(TIMESTAMP_FORMAT)
+        with self.lock:
+            with open(self._log_path(board_id), "a") as f:
+                f.write(json.dumps({"taken": taken, "manifest": manifest}) + "\n")
+
+    def boards(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-len(".jsonl")] for name in os.listdir(self.directory) if name.endswith(".jsonl"))
+
+    def runs(self, board_id):
+        """[(taken, manifest id)] for a board, oldest first."""
+        path = self._log_path(board_id)
+        if not os.path.exists(path):
+            return []
+        with open(path, "r") as f:
+            runs = [json.loads(line) for line in f if line.strip()]
+        return sorted((run["taken"], run["manifest"]) for run in runs)
+
+
+def archive_for_collect():
+    """The archive collection runs write to, or None when SNAPSHOT_ARCHIVE=0."""
+    if TrelloClient.env("SNAPSHOT_ARCHIVE", "1") == "0":
+        return None
+    return SnapshotArchive(TrelloClient.env("SNAPSHOT_ARCHIVE_DIR", ARCHIVE_DIR))
+
+
+def _replay_batch(directory, runs, rules):
+    """Process-pool entry point: aggregate a batch of consecutive runs of one board."""
+    archive = SnapshotArchive(directory)
+    heading_color = (rules or {}).get("heading_color", BoardAggregate.HEADING_COLOR)
+    objects = {}
+    tallies = {}  # (chunk, labels) -> BoardAggregate.tally(); unchanged chunks are counted once per batch
+
+    def load(digest):
+        if digest not in objects:
+            objects[digest] = archive.get(digest)
+        return objects[digest]
+
+    results = []
+    for taken, manifest_id in runs:
+        manifest = load(manifest_id)
+        lists = load(manifest["lists"])
+        labels = load(manifest["labels"])
+        hours = BoardSnapshot.hours_table(labels)
+        heading_ids = [label["id"] for label in labels if label.get("color") == heading_color]
+        parts = []
+        for chunk in manifest["chunks"]:
+            key = (chunk, manifest["labels"])
+            if key not in tallies:
+                cards = (BoardSnapshot.Card(card_id, list_id, label_ids, sum(hours.get(l, 0) for l in label_ids))
+                         for card_id, list_id, label_ids in load(chunk))
+                tallies[key] = BoardAggregate.tally(cards, heading_ids)
+            parts.append(tallies[key])
+        totals = BoardAggregate.combine(lists, parts, rules)
+        results.append((taken, {"sprint": totals["sprint"], "product": totals["product"],
+                                "finished": totals["finished"], "board": totals["board"],
+                                "headings": BoardAggregate.heading_totals(labels, totals["groups"])}))
+    return results
+
+
+def _batches(runs, count):
+    # consecutive runs share most chunks, so each worker gets a contiguous slice
+    size = max(1, -(-len(runs) // count))
+    return [runs[i:i + size] for i in range(0, len(runs), size)]
+
+
+def replay(board_id, rules=None, workers=1, directory=ARCHIVE_DIR):
+    """[(taken, totals)] for every archived run of the board, oldest first, under `rules`."""
+    runs = SnapshotArchive(directory).runs(board_id)
+    batches = _batches(runs, max(1, workers) * 4)
+    if workers <= 1 or len(batches) <= 1:
+        return [result for batch in batches for result in _replay_batch(directory, batch, rules)]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+        futures = [pool.submit(_replay_batch, directory, batch, rules) for batch in batches]
+        return [result for f in futures for result in f.result()]
+
+
+def daily(results, key="sprint"):
+    """(date, value) per day from replay() results: the day's last run wins."""
+    days = {}
+    for taken, totals in results:
+        days[taken[:10]] = totals[key]
+    return sorted(days.items())
+
+
+def write_replayed(path, entries):
+    """Write replayed daily values to a series file, keeping its StartDate if it exists."""
+    start_date = SeriesStore.read_series(path)[1] if os.path.exists(path) else None
+    SeriesStore.write_series(path, entries, start_date)
+
+
+def rules_from_args(args):
+    rules = {}
+    if args.rules:
+        with open(args.rules, "r") as f:
+            rules.update(json.load(f))
+    if args.sprint_prefix is not None:
+        rules["sprint_prefix"] = args.sprint_prefix
+    if args.finished_words:
+        rules["finished_words"] = args.finished_words
+    if args.heading_color is not None:
+        rules["heading_color"] = args.heading_color
+    return rules or None
+
+
+def _add_replay_arguments(parser):
+    parser.add_argument("--board", help="board id (defaults to every archived board)")
+    parser.add_argument("--rules", help="JSON file with sprint_prefix, finished_words and/or heading_color")
+    parser.add_argument("--sprint-prefix")
+    parser.add_argument("--finished-words", nargs="+")
+    parser.add_argument("--heading-color")
+    parser.add_argument("--series", default="sprint", choices=["sprint", "product", "finished", "board"],
+                        help="total printed and written per day")
+    parser.add_argument("--write", metavar="FILE", help="write the replayed daily totals to this series file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--archive", default=ARCHIVE_DIR)
+
+
+def run_replay(args):
+    """Replay the archive as the command line asked; returns the number of runs replayed."""
+    archive = SnapshotArchive(args.archive)
+    boards = [args.board] if args.board else archive.boards()
+    if args.write and len(boards) != 1:
+        raise SystemExit("--write needs exactly one board (use --board)")
+    rules = rules_from_args(args)
+    replayed = 0
+    for board_id in boards:
+        start = time.perf_counter()
+        results = replay(board_id, rules, args.workers, args.archive)
+        elapsed = time.perf_counter() - start
+        entries = daily(results, args.series)
+        for date_str, value in entries:
+            print(f"{board_id} {date_str} {args.series} {value}")
+        print(f"Replayed {len(results)} run(s) of {board_id} ({len(entries)} day(s)) in {elapsed:.2f}s")
+        if args.write:
+            write_replayed(args.write, entries)
+            print(f"Wrote {len(entries)} day(s) to {args.write}")
+        replayed += len(results)
+    return replayed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archived board snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    _add_replay_arguments(sub.add_parser("replay", help="recompute totals for every archived run (no network)"))
+    run_replay(parser.parse_args())
@@ -0,0 +1,162 @@
+import os
+from datetime import datetime, timedelta
+
+import SeriesStore
+
+# Sub-daily snapshots of a series with tiered rollups.
+# The series files ("Long Term.txt", ...) hold one value per day and stay the
+# daily tier. Every collection additionally records a timestamped snapshot in
+# series.db, so several runs a day (or watch mode) keep their intraday values:
+#
+#   raw     every snapshot since the series' StartDate (the current sprint)
+#   hourly  last value of each hour, for HOURLY_DAYS
+#   daily   the series file itself
+#
+# rollup() runs after each record(): raw snapshots from before the sprint start
+# are folded into hourly buckets, and hourly buckets older than HOURLY_DAYS into
+# the series file (only for days it does not already have). History therefore
+# stays bounded even at 15-minute sampling. load() reads a range at the
+# resolution that fits it, merging tiers where the finer ones have been rolled up.
+#
+# series.db is a local cache and is not committed, so the raw and hourly tiers
+# only exist where it survives between runs: watch mode, MultiBoard on a
+# long-running host, or local runs. The daily workflow starts from a fresh
+# checkout each night and keeps only the daily tier (the series file).
+
+RAW = "raw"
+HOURLY = "hourly"
+DAILY = "daily"
+HOURLY_DAYS = 90
+RAW_FALLBACK_DAYS = 14  # raw retention for series without a StartDate
+RAW_SPAN_DAYS = 7  # load() resolution: ranges up to this many days read raw snapshots
+HOURLY_SPAN_DAYS = 90  # ... up to this many days read hourly, longer ranges daily
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+_BUCKET_LENGTH = {RAW: None, HOURLY: 13, DAILY: 10}  # prefix of the timestamp that names the bucket
+
+_ready = set()
+
+
+def _conn(store):
+    conn = SeriesStore.open_store(store)
+    key = os.path.abspath(store)
+    if key in _ready:
+        return conn
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS snapshots (
+            series TEXT NOT NULL,
+            tier TEXT NOT NULL,
+            ts TEXT NOT NULL,
+            value NUMERIC NOT NULL,
+            PRIMARY KEY (series, tier, ts)
+        ) WITHOUT ROWID
+    """)
+    _ready.add(key)
+    return conn
+
+
+def _bucket(ts, resolution):
+    length = _BUCKET_LENGTH[resolution]
+    if length is None:
+        return ts
+    return ts[:length] + (":00" if resolution == HOURLY else "")
+
+
+def record(path, value, when=None, store=SeriesStore.STORE_FILE):
+    """Store a timestamped snapshot of a series and roll up the tiers."""
+    when = when or datetime.now()
+    conn = _conn(store)
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                     (SeriesStore.series_key(path), RAW, when.strftime(TIMESTAMP_FORMAT), value))
+    rollup(path, when, store)
+
+
+def clear(path, store=SeriesStore.STORE_FILE):
+    """Delete every snapshot of a series (all tiers); the series file itself is left alone."""
+    conn = _conn(store)
+    with conn:
+        conn.execute("DELETE FROM snapshots WHERE series = ?", (SeriesStore.series_key(path),))
+
+
+def _fold(conn, series, tier, before, resolution):
+    """Last value per bucket of the `tier` rows older than `before`; those rows are deleted."""
+    rows = conn.execute("SELECT ts, value FROM snapshots WHERE series = ? AND tier = ? AND ts < ? ORDER BY ts",
+                        (series, tier, before)).fetchall()
+    buckets = {}
+    for ts, value in rows:
+        buckets[_bucket(ts, resolution)] = value
+    conn.execute("DELETE FROM snapshots WHERE series = ? AND tier = ? AND ts < ?", (series, tier, before))
+    return buckets
+
+
+def rollup(path, now=None, store=SeriesStore.STORE_FILE):
+    """Fold raw snapshots from before the current sprint into hours and old hours into the series file."""
+    now = now or datetime.now()
+    series = SeriesStore.series_key(path)
+    entries, start_date = SeriesStore.read_series(path, store) if os.path.exists(path) else ([], None)
+    raw_cutoff = start_date or (now - timedelta(days=RAW_FALLBACK_DAYS)).strftime("%Y-%m-%d")
+    hourly_cutoff = (now - timedelta(days=HOURLY_DAYS)).strftime("%Y-%m-%d")
+    conn = _conn(store)
+    with conn:
+        hours = _fold(conn, series, RAW, raw_cutoff, HOURLY)
+        conn.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                         [(series, HOURLY, ts, value) for ts, value in hours.items()])
+        days = _fold(conn, series, HOURLY, hourly_cutoff, DAILY)
+    recorded = dict(entries)
+    missing = {day: value for day, value in days.items() if day not in recorded}
+    if missing:
+        SeriesStore.write_series(path, sorted(entries + list(missing.items())), start_date, store)
+    return len(hours), len(days)
+
+
+def resolution_for(start, end):
+    """Finest tier that keeps a chart of [start, end] (dates or timestamps) readable."""
+    if start is None or end is None:
+        return DAILY
+    span = datetime.fromisoformat(end) - datetime.fromisoformat(start)
+    if span <= timedelta(days=RAW_SPAN_DAYS):
+        return RAW
+    if span <= timedelta(days=HOURLY_SPAN_DAYS):
+        return HOURLY
+    return DAILY
+
+
+def load(path, start=None, end=None, resolution=None, store=SeriesStore.STORE_FILE):
+    """
+    (label, value) rows of a series between start and end (inclusive date or
+    timestamp strings), oldest first, at `resolution` (raw, hourly or daily;
+    chosen from the range when None). The series file, hourly buckets and raw
+    snapshots are merged and each bucket keeps its latest value, so days or
+    hours that were rolled up still appear at the coarser resolution.
+    """
+    series = SeriesStore.series_key(path)
+    daily = SeriesStore.load_range(path, start[:10] if start else None, end[:10] if end else None, store) \
+        if os.path.exists(path) else []
+    query = "SELECT ts, value FROM snapshots WHERE series = ?"
+    args = [series]
+    if start is not None:
+        query += " AND ts >= ?"
+        args.append(start)
+    if end is not None:
+        # a bare end date includes that whole day
+        query += " AND ts <= ?"
+        args.append(end if "T" in end else end + "T99")
+    snapshots = _conn(store).execute(query + " ORDER BY ts", args).fetchall()
+    if resolution is None:
+        labels = [row[0] for row in daily] + [row[0] for row in snapshots]
+        resolution = resolution_for(start or min(labels, default=None), end or max(labels, default=None))
+    buckets = {}
+    if resolution == DAILY:
+        # the series file is the daily tier; snapshots only fill days it lacks
+        for ts, value in snapshots:
+            buckets[ts[:10]] = value
+        buckets.update(daily)
+    else:
+        # a file value stands for the whole day, so it is only used for days without snapshots
+        finer_days = {ts[:10] for ts, _ in snapshots}
+        rows = [row for row in daily if row[0] not in finer_days] + snapshots
+        for ts, value in sorted(rows, key=lambda row: row[0]):
+            # date-only file rows keep their date label; only timestamps are bucketed
+            buckets[_bucket(ts, resolution) if "T" in ts else ts] = value
+    return sorted(buckets.items())
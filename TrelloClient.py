@@ -0,0 +1,298 @@
+import codecs
+import hashlib
+import json
+import os
+import threading
+import time
+
+import RunProfile
+import HttpCache
+
+# Shared Trello HTTP client used by BurnDownChart.py, AddCards.py and ProductBackflow.py.
+# One keep-alive Session is reused for every call and independent calls can be
+# fanned out over a bounded thread pool (TRELLO_CONCURRENCY in .env, default 8).
+#
+# Importing this module is cheap: requests and dotenv are only imported, and
+# .env only read, on first use. Settings assigned before that (e.g. BASE_URL in
+# the benchmarks) are kept.
+#
+# Every HTTP attempt, retries included, is reported to RunProfile with its
+# endpoint, status, latency and response size; a streamed response is reported
+# once its body has been read, with the bytes actually received.
+#
+# GET responses go through HttpCache (per-endpoint TTLs, conditional
+# revalidation, in-memory and on-disk LRU); TRELLO_CACHE=0 turns it off.
+API_KEY = None
+TOKEN = None
+# TRELLO_BASE_URL points the scripts at another server, e.g. FakeTrello.py
+BASE_URL = None
+MAX_CONCURRENCY = None
+# Trello allows 300 requests per 10 seconds per API key and 100 per 10 seconds per token
+KEY_RATE_LIMIT = (300, 10.0)
+TOKEN_RATE_LIMIT = (100, 10.0)
+MAX_RETRIES = 5
+STREAM_CHUNK_SIZE = 64 * 1024
+
+request_count = 0
+
+_session = None
+_executor = None
+_configured = False
+_cache = None
+_lock = threading.Lock()
+
+
+def configure():
+    """Load .env once and fill in any setting that was not assigned explicitly."""
+    global _configured, _cache, API_KEY, TOKEN, BASE_URL, MAX_CONCURRENCY
+    if _configured:
+        return
+    from dotenv import load_dotenv
+    load_dotenv()
+    if API_KEY is None:
+        API_KEY = os.getenv("API_KEY")
+    if TOKEN is None:
+        TOKEN = os.getenv("TOKEN")
+    if BASE_URL is None:
+        BASE_URL = os.getenv("TRELLO_BASE_URL", "https://api.trello.com/1")
+    if MAX_CONCURRENCY is None:
+        MAX_CONCURRENCY = int(os.getenv("TRELLO_CONCURRENCY", "8"))
+    if os.getenv("TRELLO_CACHE", "1") != "0":
+        _cache = HttpCache.HttpCache(os.getenv("TRELLO_CACHE_DIR", HttpCache.CACHE_DIR))
+    _configured = True
+
+
+def env(name, default=None):
+    """Read a setting such as BOARD_ID after making sure .env has been loaded."""
+    configure()
+    return os.getenv(name, default)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. `capacity` requests may burst, refilled at
+    capacity / period per second. On a 429 the refill rate is halved and then
+    recovers gradually as requests succeed again.
+    """
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.base_rate = capacity / period
+        self.rate = self.base_rate
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttle(self):
+        with self.lock:
+            self.rate = max(self.base_rate / 16, self.rate / 2)
+            self.tokens = 0
+
+    def recover(self):
+        if self.rate < self.base_rate:
+            with self.lock:
+                self.rate = min(self.base_rate, self.rate * 1.1)
+
+
+_buckets = [TokenBucket(*KEY_RATE_LIMIT), TokenBucket(*TOKEN_RATE_LIMIT)]
+
+
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return min(0.5 * (2 ** attempt), 30.0)
+
+
+def get_session():
+    """Return the shared Session, creating it with a pool sized to the concurrency limit."""
+    global _session
+    configure()
+    with _lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(MAX_CONCURRENCY, 1))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def set_concurrency(limit):
+    """Change the number of concurrent requests allowed; takes effect for new pools."""
+    global MAX_CONCURRENCY, _executor, _session
+    configure()
+    with _lock:
+        MAX_CONCURRENCY = max(int(limit), 1)
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="trello")
+    return _executor
+
+
+def request(method, path, params=None, stream=False, fresh=False):
+    """
+    Send one request to the Trello API. `path` is relative to BASE_URL
+    (e.g. "/boards/{id}/lists"); key and token are added automatically.
+    Every call goes through the per-key and per-token buckets and 429
+    responses are retried with backoff. With stream=True the body is left
+    unread for the caller (see iter_json). Other GETs may be answered from
+    the cache; fresh=True always asks Trello (a 304 still reuses the body).
+    """
+    global request_count
+    configure()
+    query = {"key": API_KEY, "token": TOKEN}
+    if params:
+        query.update(params)
+    url = path if path.startswith("http") else BASE_URL + path
+    cache = _cache if method == "GET" and not stream else None
+    headers = {}
+    if cache is not None:
+        endpoint = RunProfile.endpoint_template(method, path)
+        key = cache.key(url, params, hashlib.sha256(f"{API_KEY}:{TOKEN}".encode()).hexdigest())
+        entry = cache.lookup(key)
+        if entry is not None and not fresh and cache.is_fresh(entry, endpoint):
+            cache.count(HttpCache.HIT)
+            return HttpCache.CachedResponse(entry)
+        headers = cache.conditional_headers(entry)
+    attempt = 0
+    while True:
+        for bucket in _buckets:
+            bucket.acquire()
+        with _lock:
+            request_count += 1
+        started = time.perf_counter()
+        response = get_session().request(method, url, params=query, stream=stream, headers=headers)
+        retry = response.status_code == 429 and attempt < MAX_RETRIES
+        if stream and not retry:
+            # the body has not been read yet; iter_json records the request once it has
+            response.started = started
+        else:
+            RunProfile.record_request(method, path, response.status_code, time.perf_counter() - started,
+                                      len(response.content))
+        if not retry:
+            for bucket in _buckets:
+                bucket.recover()
+            if cache is not None:
+                if response.status_code == 304 and entry is not None:
+                    cache.refresh(key, entry)
+                    cache.count(HttpCache.REVALIDATED)
+                    return HttpCache.CachedResponse(entry)
+                cache.count(HttpCache.MISS)
+                cache.store(key, endpoint, response)
+            elif method != "GET" and _cache is not None and response.status_code < 400:
+                # the board changed; drop everything that may now be stale
+                _cache.clear()
+            return response
+        if stream:
+            response.close()
+        # rate limited: slow every caller down and back off before retrying
+        for bucket in _buckets:
+            bucket.throttle()
+        time.sleep(_retry_delay(response, attempt))
+        attempt += 1
+
+
+def get(path, params=None, fresh=False):
+    return request("GET", path, params, fresh=fresh)
+
+
+def post(path, params=None):
+    return request("POST", path, params)
+
+
+def iter_json_array(chunks):
+    """
+    Yield the elements of a JSON array from an iterable of byte chunks as
+    soon as each element is complete, so only the current element and the
+    unparsed tail of the last chunk are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    opened = False
+    for chunk in chunks:
+        buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not opened:
+                if buf[pos] != "[":
+                    raise ValueError("expected a JSON array")
+                opened = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                break  # element continues in the next chunk
+            if isinstance(item, (int, float)) and (end == len(buf) or buf[end] in ".eE+-0123456789"):
+                break  # a number cut off by the chunk boundary (e.g. "3." or "1e")
+            yield item
+            pos = end
+    raise ValueError("truncated JSON array")
+
+
+def iter_json(path, params=None, chunk_size=STREAM_CHUNK_SIZE):
+    """GET an endpoint that returns a JSON array and yield its elements while the body downloads."""
+    response = request("GET", path, params, stream=True)
+    received = 0
+
+    def counted(chunks):
+        nonlocal received
+        for chunk in chunks:
+            received += len(chunk)
+            yield chunk
+
+    try:
+        with response:
+            if response.status_code != 200:
+                received = len(response.content)
+                raise RuntimeError(f"GET {path} failed: {response.status_code} {response.text}")
+            yield from iter_json_array(counted(response.iter_content(chunk_size)))
+    finally:
+        RunProfile.record_request("GET", path, response.status_code, time.perf_counter() - response.started,
+                                  received)
+
+
+def map_concurrent(fn, items):
+    """Run fn over items on the shared pool and return the results in input order."""
+    configure()
+    items = list(items)
+    if len(items) <= 1 or MAX_CONCURRENCY <= 1:
+        return [fn(item) for item in items]
+    return list(_get_executor().map(fn, items))
@@ -0,0 +1,155 @@
+import numpy as np
+
+# Velocity analytics and completion forecasting for the stored series.
+# Series are turned into NumPy arrays once and every statistic is computed in
+# vectorized passes; analyze_many() pads the full history of any number of
+# series (Long Term, every Sprint file, ProductInfo) into one 2-D array and fits
+# them all at once, along with the daily burn deltas of the whole history and
+# the trailing ROLLING_WINDOW_DAYS velocity.
+#
+# The forecast is a least-squares line through the last FIT_WINDOW_DAYS of a
+# series. The projected completion date is where that line reaches zero, and
+# the band is the 95% confidence interval of the fitted line.
+
+FIT_WINDOW_DAYS = 14
+ROLLING_WINDOW_DAYS = 7
+HORIZON_DAYS = 365  # how far past the last point to look for a completion date
+Z_95 = 1.96
+
+
+def series_arrays(entries):
+    """(dateStr, value) rows -> (days as datetime64[D], values as float64), sorted, invalid dates dropped."""
+    entries = list(entries)
+    try:
+        days = np.array([d for d, _ in entries], dtype="datetime64[D]")
+        vals = np.array([v for _, v in entries], dtype=np.float64)
+    except ValueError:
+        # slow path only when some row does not parse
+        kept = []
+        for dateStr, value in entries:
+            try:
+                kept.append((np.datetime64(dateStr, "D"), float(value)))
+            except ValueError:
+                continue
+        days = np.array([d for d, _ in kept], dtype="datetime64[D]")
+        vals = np.array([v for _, v in kept], dtype=np.float64)
+    order = np.argsort(days, kind="stable")
+    return days[order], vals[order]
+
+
+def _to_datetime(day):
+    """datetime64[D] scalar or array -> datetime.datetime (what the charts plot against)."""
+    return day.astype("datetime64[s]").astype(object)
+
+
+def _pad(series_list):
+    """Ragged (days, values) pairs -> padded t/v matrices (days since each series' first day) and a validity mask."""
+    longest = max((len(d) for d, _ in series_list), default=0)
+    rows = len(series_list)
+    t = np.zeros((rows, max(longest, 1)))
+    v = np.zeros((rows, max(longest, 1)))
+    mask = np.zeros((rows, max(longest, 1)), dtype=bool)
+    origins = np.empty(rows, dtype="datetime64[D]")
+    for i, (days, values) in enumerate(series_list):
+        if len(days) == 0:
+            origins[i] = np.datetime64("1970-01-01")
+            continue
+        origins[i] = days[0]
+        n = len(days)
+        t[i, :n] = (days - origins[i]).astype(np.float64)
+        v[i, :n] = values
+        mask[i, :n] = True
+    return t, v, mask, origins
+
+
+def analyze_many(named_entries, window=FIT_WINDOW_DAYS, horizon=HORIZON_DAYS, rolling_window=ROLLING_WINDOW_DAYS):
+    """
+    Fit every series in one vectorized pass.
+    named_entries: {name: [(dateStr, value), ...]}. Returns {name: forecast dict}
+    (see analyze()); series with fewer than 3 points get no forecast.
+    """
+    names = list(named_entries)
+    series_list = [series_arrays(named_entries[name]) for name in names]
+    if not names:
+        return {}
+    t, v, padded, origins = _pad(series_list)
+    rows = np.arange(len(names))
+    last_t = np.where(padded, t, -np.inf).max(axis=1)
+    last_v = v[rows, np.maximum(padded.sum(axis=1) - 1, 0)]
+
+    # burn per day between consecutive points over the whole history (positive = work done)
+    pairs = padded[:, 1:]
+    gaps = np.diff(t, axis=1)
+    deltas = np.where(pairs, np.diff(v, axis=1) / -np.where(gaps > 0, gaps, 1.0), 0.0) + 0.0
+
+    # average burn per day from the first point in the trailing rolling window to the last point
+    first = (padded & (t >= (last_t - rolling_window)[:, None])).argmax(axis=1)
+    roll_span = last_t - t[rows, first]
+    rolling = np.divide(v[rows, first] - last_v, roll_span, out=np.zeros(len(names)), where=roll_span > 0)
+
+    # only the fit is restricted to the trailing window
+    mask = padded & (t >= (last_t - window)[:, None])
+    n = mask.sum(axis=1).astype(np.float64)
+    safe_n = np.where(n > 0, n, 1)
+    t_bar = (t * mask).sum(axis=1) / safe_n
+    v_bar = (v * mask).sum(axis=1) / safe_n
+    dt = np.where(mask, t - t_bar[:, None], 0.0)
+    dv = np.where(mask, v - v_bar[:, None], 0.0)
+    sxx = (dt * dt).sum(axis=1)
+    sxy = (dt * dv).sum(axis=1)
+    slope = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+    intercept = v_bar - slope * t_bar
+    resid = np.where(mask, v - (intercept[:, None] + slope[:, None] * t), 0.0)
+    dof = np.maximum(n - 2, 1)
+    s = np.sqrt((resid * resid).sum(axis=1) / dof)
+
+    # evaluate fitted line and its band on a daily grid past the last point
+    # (an empty series has no last point; its row is never reported)
+    grid = np.where(np.isfinite(last_t), last_t, 0.0)[:, None] + np.arange(horizon + 1)[None, :]
+    fitted = intercept[:, None] + slope[:, None] * grid
+    se = s[:, None] * np.sqrt(1.0 / safe_n[:, None] + (grid - t_bar[:, None]) ** 2
+                              / np.where(sxx > 0, sxx, 1)[:, None])
+    lower = fitted - Z_95 * se
+    upper = fitted + Z_95 * se
+
+    def first_zero(curve):
+        hit = curve <= 0
+        idx = hit.argmax(axis=1)
+        return np.where(hit.any(axis=1), idx, -1)
+
+    at_mid, at_low, at_high = first_zero(fitted), first_zero(lower), first_zero(upper)
+
+    results = {}
+    for i, name in enumerate(names):
+        if n[i] < 3:
+            results[name] = None
+            continue
+
+        def to_date(idx):
+            if idx < 0:
+                return None
+            return _to_datetime(origins[i] + np.timedelta64(int(round(grid[i, idx])), "D"))
+
+        # a series already at zero is complete even though it is no longer sloping down
+        burning = slope[i] < 0 or last_v[i] <= 0
+        results[name] = {
+            "velocity": float(-slope[i]),  # units burned per day, from the fit
+            "rolling_velocity": float(rolling[i]),  # over the last rolling_window days
+            # burn per day between consecutive points of the whole series, dated by the later point
+            "deltas": deltas[i][pairs[i]],
+            "delta_dates": _to_datetime(origins[i] + t[i, 1:][pairs[i]].astype("timedelta64[D]")),
+            "completion": to_date(at_mid[i]) if burning else None,
+            # the lower band reaches zero first, the upper band last
+            "completion_early": to_date(at_low[i]),
+            "completion_late": to_date(at_high[i]) if burning else None,
+            "band_dates": _to_datetime(origins[i] + grid[i].astype("timedelta64[D]")),
+            "band_low": np.maximum(lower[i], 0),
+            "band_high": np.maximum(upper[i], 0),
+            "fit": fitted[i],
+        }
+    return results
+
+
+def analyze(entries, window=FIT_WINDOW_DAYS, horizon=HORIZON_DAYS):
+    """Forecast for a single series, or None if it has fewer than 3 points in the window."""
+    return analyze_many({"series": entries}, window, horizon)["series"]
@@ -0,0 +1,252 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import TrelloClient
+import ActionsFeed
+import SeriesStore
+import Snapshots
+
+# Watch mode: keep the burndown current from Trello webhooks instead of polling.
+# A small HTTP receiver takes the webhook callbacks for the board and applies
+# each card, list or label action to the same in-memory per-card hour table the
+# incremental collector uses (ActionsFeed). Changes are flushed in debounced
+# batches: once the board has been quiet for `debounce` seconds, or at most
+# `max_delay` seconds after the first unflushed event, today's sprint total is
+# written to Long Term.txt through SeriesStore (plus a timestamped snapshot, see
+# Snapshots) and the table is saved to card_hours_cache.json, so the daily
+# incremental run continues from it.
+#
+#   python Watch.py --port 8787 [--callback-url https://example.org/trello]
+#   python Watch.py --send webhook_payloads.jsonl --url http://127.0.0.1:8787/
+#
+# Trello verifies a callback URL with a HEAD request before it creates the
+# webhook, so the receiver must be reachable from the internet (e.g. through a
+# tunnel) when --callback-url is given. With TRELLO_SECRET in .env the
+# X-Trello-Webhook signature of every callback is checked.
+
+SERIES_FILE = "Long Term.txt"
+DEBOUNCE_SECONDS = 5.0
+MAX_DELAY_SECONDS = 60.0
+SEEN_LIMIT = 10000  # recent action ids kept to drop duplicate deliveries
+RELEVANT_ACTIONS = set(ActionsFeed.ACTION_FILTER.split(","))
+
+
+class Watcher:
+    """Per-card hour table updated from webhook actions and flushed in debounced batches."""
+
+    def __init__(self, board_id, series=SERIES_FILE, cache=ActionsFeed.CACHE_FILE,
+                 debounce=DEBOUNCE_SECONDS, max_delay=MAX_DELAY_SECONDS):
+        self.board_id = board_id
+        self.series = series
+        self.cache = cache
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = False
+        self.first_event = None
+        self.last_event = None
+        self.pending = 0
+        self.seen = deque(maxlen=SEEN_LIMIT)
+        self.seen_ids = set()
+        self.events = 0
+        self.flushes = 0
+        # catch up on whatever happened while nothing was watching
+        self.state = ActionsFeed.refresh_state(board_id, cache)
+        self.thread = threading.Thread(target=self._flush_loop, name="watch-flush", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        """Stop the flusher, writing out anything still pending."""
+        self.stopping = True
+        self.wake.set()
+        self.thread.join()
+
+    def handle(self, action):
+        """Apply one webhook action. Returns False if it was ignored (irrelevant or a duplicate)."""
+        if not action or action.get("type") not in RELEVANT_ACTIONS:
+            return False
+        with self.lock:
+            if action["id"] in self.seen_ids:
+                return False
+            if len(self.seen) == self.seen.maxlen:
+                self.seen_ids.discard(self.seen[0])
+            self.seen.append(action["id"])
+            self.seen_ids.add(action["id"])
+            cursor = self.state["cursor"]
+            ActionsFeed.apply_action(self.state, action)
+            # deliveries can arrive out of order; the cursor only moves forward
+            if cursor and cursor > action["id"]:
+                self.state["cursor"] = cursor
+            now = time.monotonic()
+            if self.pending == 0:
+                self.first_event = now
+            self.last_event = now
+            self.pending += 1
+            self.events += 1
+        self.wake.set()
+        return True
+
+    def flush(self):
+        """Write today's sprint total and save the table. Returns the total."""
+        with self.lock:
+            if self.state["dirty"]:
+                print("Watch: an action needs a full scan to apply")
+                self.state = ActionsFeed.full_scan(self.board_id)
+            elif self.state.get("unresolved"):
+                # cards created since the last flush: their labels are not in the webhook payload
+                ActionsFeed.resolve_cards(self.state)
+            total = ActionsFeed.sprint_total(self.state)
+            batch = self.pending
+            self.pending = 0
+            ActionsFeed.save_state(self.state, self.cache)
+        today = datetime.now().strftime("%Y-%m-%d")
+        SeriesStore.set_value(self.series, today, total, today)
+        Snapshots.record(self.series, total)
+        self.flushes += 1
+        print(f"Watch: flushed {batch} event(s), {today} sprint total {total}")
+        return total
+
+    def _due_in(self):
+        """Seconds until the pending batch should be flushed (0 = now), or None if nothing is pending."""
+        with self.lock:
+            if self.pending == 0:
+                return None
+            now = time.monotonic()
+            return max(0.0, min(self.last_event + self.debounce, self.first_event + self.max_delay) - now)
+
+    def _flush_loop(self):
+        while True:
+            due = self._due_in()
+            if self.stopping:
+                if due is not None:
+                    self.flush()
+                return
+            if due == 0:
+                self.flush()
+                continue
+            self.wake.wait(due)
+            self.wake.clear()
+
+
+def verify_signature(body, callback_url, secret, signature):
+    """Trello signs base64(HMAC-SHA1(secret, body + callbackURL)) in X-Trello-Webhook."""
+    digest = hmac.new(secret.encode(), body + callback_url.encode(), hashlib.sha1).digest()
+    return hmac.compare_digest(base64.b64encode(digest).decode(), signature or "")
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, text=""):
+        body = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        # Trello checks the callback URL with a HEAD request before creating the webhook
+        self._reply(200)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if server.secret and server.callback_url and not verify_signature(
+                body, server.callback_url, server.secret, self.headers.get("X-Trello-Webhook")):
+            self._reply(401, "bad signature")
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._reply(400, "invalid JSON")
+            return
+        if not isinstance(payload, dict) or not isinstance(payload.get("action") or {}, dict):
+            self._reply(400, "expected a webhook payload object")
+            return
+        server.watcher.handle(payload.get("action"))
+        self._reply(200, "ok")
+
+
+class WebhookServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, watcher, callback_url=None, secret=None):
+        super().__init__(address, WebhookHandler)
+        self.watcher = watcher
+        self.callback_url = callback_url
+        self.secret = secret
+
+
+def register_webhook(board_id, callback_url, description="burndown watch"):
+    """Create the Trello webhook for the board; Trello calls callback_url for every action on it."""
+    resp = TrelloClient.post("/webhooks", {"callbackURL": callback_url, "idModel": board_id,
+                                           "description": description})
+    if resp.status_code != 200:
+        raise RuntimeError(f"Failed to register webhook: {resp.status_code} {resp.text}")
+    return resp.json()
+
+
+def send_payloads(path, url):
+    """POST recorded webhook payloads (one JSON object per line) to a running receiver."""
+    import requests
+    sent = 0
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                requests.post(url, data=line.encode(), headers={"Content-Type": "application/json"})
+                sent += 1
+    print(f"Sent {sent} payload(s) to {url}")
+    return sent
+
+
+def watch(board_id, host="127.0.0.1", port=8787, callback_url=None, debounce=DEBOUNCE_SECONDS,
+          max_delay=MAX_DELAY_SECONDS):
+    """Run the receiver until interrupted."""
+    watcher = Watcher(board_id, debounce=debounce, max_delay=max_delay)
+    server = WebhookServer((host, port), watcher, callback_url, TrelloClient.env("TRELLO_SECRET"))
+    watcher.start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Watching board {board_id} on http://{host}:{server.server_address[1]}/")
+    if callback_url:
+        webhook = register_webhook(board_id, callback_url)
+        print(f"Registered webhook {webhook.get('id')} -> {callback_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        watcher.stop()
+    return watcher
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the burndown current from Trello webhooks")
+    parser.add_argument("--board", help="board id (defaults to BOARD_ID from .env)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--callback-url", help="public URL of this receiver; registers the webhook")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS)
+    parser.add_argument("--max-delay", type=float, default=MAX_DELAY_SECONDS)
+    parser.add_argument("--send", metavar="PAYLOADS", help="POST recorded payloads to --url instead of watching")
+    parser.add_argument("--url", default="http://127.0.0.1:8787/")
+    args = parser.parse_args()
+    if args.send:
+        send_payloads(args.send, args.url)
+    else:
+        watch(args.board or TrelloClient.env("BOARD_ID"), args.host, args.port, args.callback_url,
+              args.debounce, args.max_delay)
@@ -0,0 +1,126 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Benchmarks the collectors against the offline Trello stand-in (FakeTrello.py).
+# The fake server runs in its own process so peak memory is the client's only.
+#
+#   python benchmarks/bench_collectors.py --sizes 100 10000 100000 --latency 0.02
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# measure the collectors themselves: every benchmark goes to the (fake) server
+os.environ["TRELLO_CACHE"] = "0"
+os.environ["SNAPSHOT_ARCHIVE"] = "0"
+
+import FakeTrello  # noqa: E402
+import TrelloClient  # noqa: E402
+import BurnDownChart  # noqa: E402
+import ProductBackflow  # noqa: E402
+import AddCards  # noqa: E402
+
+BOARD_ID = "fakeboard"
+
+
+def _serve(conn, num_cards, num_lists, latency, error_429_every):
+    server = FakeTrello.start_fake_trello(num_cards, num_lists, latency, error_429_every, board_id=BOARD_ID)
+    import_list = next(lst["name"] for lst in server.board.lists if lst["name"].startswith("Backlog"))
+    conn.send((server.base_url, import_list))
+    conn.recv()
+    conn.send(dict(server.request_log))
+    server.shutdown()
+
+
+def _write_cards_file(path, count):
+    with open(path, "w") as f:
+        for i in range(count):
+            if i % 10 == 0:
+                f.write(f"Benchmark heading {i // 10}\n")
+            f.write(f"Benchmark card {i} ({(1, 2, 4, 8)[i % 4]} hrs)\n")
+
+
+def measure(name, fn):
+    """Run fn once and return wall time, Trello requests and peak traced memory."""
+    requests_before = TrelloClient.request_count
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "benchmark": name,
+        "seconds": elapsed,
+        "requests": TrelloClient.request_count - requests_before,
+        "peak_kib": peak / 1024,
+        "result": result,
+    }
+
+
+def collect_data(snapshot):
+    BurnDownChart.cardsLeftToDo = 0
+    BurnDownChart.graphMap = {}
+    BurnDownChart.BOARD_ID = BOARD_ID
+    BurnDownChart.CollectData(snapshot=snapshot)
+    return BurnDownChart.cardsLeftToDo
+
+
+def run_size(num_cards, args, workdir):
+    parent, child = multiprocessing.Pipe()
+    proc = multiprocessing.Process(target=_serve,
+                                   args=(child, num_cards, args.lists, args.latency, args.error_429_every))
+    proc.start()
+    base_url, import_list = parent.recv()
+    TrelloClient.BASE_URL = base_url
+    # pay the lazy requests import up front so it is not charged to the first benchmark
+    TrelloClient.get_session()
+    rows = [
+        measure("CollectData (snapshot)", lambda: collect_data(True)),
+        measure("CollectData (per-list)", lambda: collect_data(False)),
+        measure("_fetch_product_label_sum", lambda: BurnDownChart._fetch_product_label_sum(BOARD_ID)),
+        measure("get_board_label_sum", lambda: ProductBackflow.get_board_label_sum(BOARD_ID)),
+    ]
+    import_count = min(num_cards, args.import_cards)
+    cards_path = os.path.join(workdir, f"cards_{num_cards}.txt")
+    _write_cards_file(cards_path, import_count)
+    rows.append(measure(f"add_cards_from_file ({import_count} cards)",
+                        lambda: AddCards.add_cards_from_file(cards_path, BOARD_ID, import_list)))
+    parent.send("stop")
+    server_log = parent.recv()
+    proc.join()
+    return rows, server_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Trello collectors against FakeTrello.py")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 100000])
+    parser.add_argument("--lists", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of simulated latency per request")
+    parser.add_argument("--error-429-every", type=int, default=0)
+    parser.add_argument("--import-cards", type=int, default=200, help="cap on cards imported per size")
+    parser.add_argument("--verbose", action="store_true", help="keep the scripts' own output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for num_cards in args.sizes:
+            devnull = open(os.devnull, "w")
+            stdout = sys.stdout
+            if not args.verbose:
+                sys.stdout = devnull
+            try:
+                rows, server_log = run_size(num_cards, args, workdir)
+            finally:
+                sys.stdout = stdout
+                devnull.close()
+            print(f"\n== board with {num_cards} cards, {args.lists} lists, latency {args.latency}s ==")
+            print(f"{'benchmark':40} {'seconds':>9} {'requests':>9} {'peak KiB':>11}")
+            for row in rows:
+                print(f"{row['benchmark']:40} {row['seconds']:9.3f} {row['requests']:9d} {row['peak_kib']:11.1f}")
+            print("server endpoints: " + ", ".join(f"{k}={v}" for k, v in sorted(server_log.items())))
+
+
+if __name__ == "__main__":
+    main()
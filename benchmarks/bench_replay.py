@@ -0,0 +1,87 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Benchmarks SnapshotArchive: archive size for a year of daily snapshots of a
+# synthetic board (a few cards added, moved and finished every day), and how
+# long a full replay under changed rules takes with 1 and N worker processes.
+#
+#   python benchmarks/bench_replay.py --days 365 --cards 5000 --workers 8
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import BoardSnapshot  # noqa: E402
+import SnapshotArchive  # noqa: E402
+
+
+def _board(num_cards, num_lists, rng):
+    lists = [{"id": f"list{i:04d}", "name": (f"sp {i}" if i % 3 == 0 else f"Backlog {i}")} for i in range(num_lists)]
+    lists.append({"id": "listdone", "name": "Finished"})
+    labels = [{"id": f"label{h:02d}", "name": str(h), "color": "green"} for h in range(1, 9)]
+    labels += [{"id": f"head{i}", "name": f"Heading {i}", "color": "blue"} for i in range(5)]
+    cards = {}
+    for i in range(num_cards):
+        cards[f"{i:024x}"] = [rng.choice(lists)["id"], [rng.choice(labels[:8])["id"], f"head{i % 5}"]]
+    return lists, labels, cards
+
+
+def _evolve(lists, labels, cards, rng, churn):
+    next_id = int(max(cards), 16) + 1
+    for _ in range(churn):
+        card_id = rng.choice(list(cards))
+        cards[card_id][0] = rng.choice(lists)["id"]
+    for i in range(churn // 2):
+        cards[f"{next_id + i:024x}"] = [rng.choice(lists)["id"], [rng.choice(labels[:8])["id"]]]
+
+
+def build_archive(directory, days, num_cards, num_lists, churn):
+    rng = random.Random(1)
+    archive = SnapshotArchive.SnapshotArchive(directory)
+    lists, labels, cards = _board(num_cards, num_lists, rng)
+    hours = BoardSnapshot.hours_table(labels)
+    start = datetime(2025, 1, 1, 6)
+    for day in range(days):
+        records = (BoardSnapshot.Card(card_id, list_id, tuple(label_ids), sum(hours[l] for l in label_ids))
+                   for card_id, (list_id, label_ids) in sorted(cards.items(), reverse=True))
+        for _ in archive.record("benchboard", lists, labels, records, start + timedelta(days=day)):
+            pass
+        _evolve(lists, labels, cards, rng, churn)
+    return archive
+
+
+def _size(directory):
+    total = 0
+    for root, _, files in os.walk(directory):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the snapshot archive and replay")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--cards", type=int, default=5000)
+    parser.add_argument("--lists", type=int, default=12)
+    parser.add_argument("--churn", type=int, default=40, help="cards moved per day (half as many are added)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = os.path.join(tmp, "archive")
+        start = time.perf_counter()
+        archive = build_archive(directory, args.days, args.cards, args.lists, args.churn)
+        elapsed = time.perf_counter() - start
+        print(f"Archived {args.days} day(s) of a {args.cards}-card board in {elapsed:.2f}s: "
+              f"{archive.written} object(s), {_size(directory) / 1e6:.1f} MB")
+        rules = {"sprint_prefix": "backlog"}
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            results = SnapshotArchive.replay("benchboard", rules, workers, directory)
+            elapsed = time.perf_counter() - start
+            print(f"Replayed {len(results)} run(s) with {workers} worker(s) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
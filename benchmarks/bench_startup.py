@@ -0,0 +1,81 @@
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Startup benchmark for BurnDownCLI.py: time from process start to the first
+# line of output, compared with a process that eagerly imports what the old
+# scripts loaded at the top of the file (requests and dotenv, plus matplotlib
+# for graphing runs). Also reports which heavy modules each command loaded.
+#
+#   python benchmarks/bench_startup.py --runs 10
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(REPO, "BurnDownCLI.py")
+HEAVY = ("requests", "dotenv", "matplotlib")
+DATA_FILES = ["Long Term.txt", "ProductInfo.txt", "Sprint1 BurnDownChart", "Sprint2 BurnDownChart"]
+
+CASES = [
+    ("BurnDownCLI.py --help", [CLI, "--help"]),
+    ("BurnDownCLI.py product (file-only)", [CLI, "product"]),
+    ("eager: requests + dotenv", ["-c", "import requests, dotenv; dotenv.load_dotenv(); print('ready')"]),
+    ("eager: requests + dotenv + matplotlib",
+     ["-c", "import requests, dotenv, matplotlib.pyplot; dotenv.load_dotenv(); print('ready')"]),
+]
+
+MODULE_PROBE = """
+import runpy, sys
+sys.argv = {argv!r}
+sys.path.insert(0, {repo!r})
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+except SystemExit:
+    pass
+sys.stderr.write("LOADED " + ",".join(m for m in {heavy!r} if m in sys.modules) + "\\n")
+"""
+
+
+def first_output_seconds(argv, cwd):
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable] + argv, cwd=cwd, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+    proc.stdout.readline()
+    elapsed = time.perf_counter() - start
+    proc.stdout.read()
+    proc.wait()
+    return elapsed
+
+
+def loaded_modules(argv, cwd):
+    if argv[0] == "-c":
+        return "n/a"
+    code = MODULE_PROBE.format(argv=argv, repo=REPO, heavy=HEAVY)
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True,
+                            stdin=subprocess.DEVNULL)
+    for line in result.stderr.splitlines():
+        if line.startswith("LOADED "):
+            return line[len("LOADED "):] or "none"
+    return "?"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI time-to-first-output")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        # file-only commands write to the series files, so run them on copies
+        for name in DATA_FILES:
+            if os.path.exists(os.path.join(REPO, name)):
+                shutil.copy(os.path.join(REPO, name), workdir)
+        print(f"{'command':42} {'median s':>9} {'min s':>8}  heavy modules loaded")
+        for label, argv in CASES:
+            times = [first_output_seconds(argv, workdir) for _ in range(args.runs)]
+            print(f"{label:42} {statistics.median(times):9.3f} {min(times):8.3f}  {loaded_modules(argv, workdir)}")
+
+
+if __name__ == "__main__":
+    main()
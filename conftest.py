@@ -0,0 +1,21 @@
+import pytest
+
+import FakeTrello
+import TrelloClient
+
+BOARD_ID = "fakeboard"
+
+
+@pytest.fixture
+def fake_trello(tmp_path, monkeypatch):
+    """An offline Trello (FakeTrello) that TrelloClient talks to, run from an empty directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SNAPSHOT_ARCHIVE", "0")
+    server = FakeTrello.start_fake_trello(num_cards=200, num_lists=12, board_id=BOARD_ID, history_days=3)
+    TrelloClient.configure()
+    monkeypatch.setattr(TrelloClient, "BASE_URL", server.base_url)
+    monkeypatch.setattr(TrelloClient, "API_KEY", "key")
+    monkeypatch.setattr(TrelloClient, "TOKEN", "token")
+    monkeypatch.setattr(TrelloClient, "_cache", None)
+    yield server
+    server.shutdown()
@@ -0,0 +1,62 @@
+import ActionsFeed
+import AddCards
+import Backfill
+import BoardAggregate
+import SeriesStore
+from conftest import BOARD_ID
+
+
+def _sprint_total():
+    return BoardAggregate.collect(BOARD_ID)["sprint"]
+
+
+def test_incremental_counts_cards_created_with_labels(fake_trello):
+    board = fake_trello.board
+    state = ActionsFeed.refresh_state(BOARD_ID)
+    assert ActionsFeed.sprint_total(state) == _sprint_total()
+    sprint_list = next(lst["id"] for lst in board.lists if lst["name"].startswith("sp "))
+    hour_label = next(label["id"] for label in board.labels if label["name"] == "8")
+    # a few new cards are read one by one, many from the board's cards
+    for count in (3, ActionsFeed.RESOLVE_ONE_BY_ONE + 5):
+        for i in range(count):
+            AddCards.create_card(sprint_list, f"New card {i}", [hour_label])
+        state = ActionsFeed.refresh_state(BOARD_ID)
+        assert state["unresolved"] == []
+        assert ActionsFeed.sprint_total(state) == _sprint_total()
+
+
+def test_backfill_replay_ends_at_the_current_total(fake_trello, tmp_path):
+    progress = Backfill.new_progress(BOARD_ID)
+    meta = Backfill.download(BOARD_ID, None, str(tmp_path / "spool"))
+    for page in Backfill.spooled_pages(str(tmp_path / "spool"), meta["pages"]):
+        Backfill.replay(page, progress)
+    assert progress["inexact"] == 0
+    assert progress["total"] == _sprint_total()
+
+
+def test_backfill_rebuilds_labels_at_creation(fake_trello, tmp_path):
+    board = fake_trello.board
+    sprint_list = next(lst["id"] for lst in board.lists if lst["name"].startswith("sp "))
+    hours = {label["name"]: label["id"] for label in board.labels}
+    card = board.create_card(sprint_list, "Relabelled", [hours["2"]], None)
+    board.add_card_label(card["id"], hours["8"])
+    board.remove_card_label(card["id"], hours["2"])
+    spool = str(tmp_path / "spool")
+    meta = Backfill.download(BOARD_ID, None, spool)
+    created = [action for page in Backfill.spooled_pages(spool, meta["pages"]) for action in page
+               if action["type"] == "createCard" and action["data"]["card"]["id"] == card["id"]]
+    assert created[0]["data"]["card"]["idLabels"] == [hours["2"]]
+    progress = Backfill.new_progress(BOARD_ID)
+    for page in Backfill.spooled_pages(spool, meta["pages"]):
+        Backfill.replay(page, progress)
+    assert progress["total"] == _sprint_total()
+
+
+def test_backfill_fills_a_day_with_the_total_when_it_began(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    SeriesStore.write_series("Long Term.txt", [("2025-11-01", 50), ("2025-11-04", 20)])
+    filled = Backfill.fill_gaps({"2025-11-01": 40, "2025-11-02": 30, "2025-11-03": 25}, "Long Term.txt")
+    assert filled == ["2025-11-02", "2025-11-03"]
+    # the 00:00 UTC job records the previous day's closing total
+    assert SeriesStore.read_series("Long Term.txt")[0] == [("2025-11-01", 50), ("2025-11-02", 40),
+                                                           ("2025-11-03", 30), ("2025-11-04", 20)]
@@ -0,0 +1,78 @@
+import threading
+
+import AddCards
+import TrelloClient
+from conftest import BOARD_ID
+
+LIST_NAME = "Backlog 1"
+CARDS_FILE = """Heading A
+First (1 hrs)
+Second (2 hrs)
+Heading B
+Third (4 hrs)
+Fourth (8 hrs)
+Fifth (1 hrs)
+"""
+
+
+def _imported_names(server):
+    list_id = next(lst["id"] for lst in server.board.lists if lst["name"] == LIST_NAME)
+    return [card["name"] for card in server.board.list_cards(list_id)
+            if card["name"] in ("First", "Second", "Third", "Fourth", "Fifth")]
+
+
+def test_resumed_pipeline_import_keeps_file_order(fake_trello, tmp_path, monkeypatch):
+    path = tmp_path / "cards.txt"
+    path.write_text(CARDS_FILE)
+    create_card = AddCards.create_card
+
+    def flaky_create_card(list_id, name, label_ids, pos=None):
+        # the first run is interrupted for every other card
+        return None if name in ("First", "Third", "Fifth") else create_card(list_id, name, label_ids, pos)
+
+    monkeypatch.setattr(AddCards, "create_card", flaky_create_card)
+    AddCards.import_cards_pipeline(str(path), BOARD_ID, LIST_NAME)
+    assert _imported_names(fake_trello) == ["Second", "Fourth"]
+    monkeypatch.setattr(AddCards, "create_card", create_card)
+    AddCards.import_cards_pipeline(str(path), BOARD_ID, LIST_NAME)
+    assert _imported_names(fake_trello) == ["First", "Second", "Third", "Fourth", "Fifth"]
+
+
+def test_labels_are_created_concurrently_but_once_per_name(monkeypatch):
+    both_waiting = threading.Barrier(2, timeout=5)
+    posts = []
+
+    class Response:
+        status_code = 200
+
+        def __init__(self, name):
+            self.name = name
+
+        def json(self):
+            return {"id": "id-" + self.name}
+
+    def post(path, params):
+        posts.append(params["name"])
+        if params["name"] in ("A", "B"):
+            # fails (BrokenBarrierError) if the two creations are serialized
+            both_waiting.wait()
+        return Response(params["name"])
+
+    monkeypatch.setattr(TrelloClient, "post", post)
+    index = {}
+    threads = [threading.Thread(target=AddCards.get_or_create_label, args=(index, "board", name, "blue"))
+               for name in ("A", "B")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert index == {("A", "blue"): "id-A", ("B", "blue"): "id-B"}
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        AddCards.get_or_create_label(index, "board", "C", "green"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["id-C"] * 8
+    assert sorted(posts) == ["A", "B", "C"]
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+import BurnDownChart
+import Snapshots
+from conftest import BOARD_ID
+
+
+def test_failed_collection_records_nothing(fake_trello, monkeypatch):
+    monkeypatch.setattr(BurnDownChart, "BOARD_ID", "no-such-board")
+    monkeypatch.setattr(BurnDownChart, "graphMap", {})
+    monkeypatch.setattr(BurnDownChart, "cardsLeftToDo", 0)
+    assert BurnDownChart.CollectData() is False
+    assert BurnDownChart.CollectData(snapshot=False) is False
+    assert BurnDownChart.CollectData(incremental=True) is False
+    assert BurnDownChart.graphMap == {}
+
+
+def test_collection_records_sprint_total(fake_trello, monkeypatch):
+    monkeypatch.setattr(BurnDownChart, "BOARD_ID", BOARD_ID)
+    monkeypatch.setattr(BurnDownChart, "graphMap", {})
+    monkeypatch.setattr(BurnDownChart, "cardsLeftToDo", 0)
+    assert BurnDownChart.CollectData() is True
+    snapshot = list(BurnDownChart.graphMap.values())
+    monkeypatch.setattr(BurnDownChart, "graphMap", {})
+    monkeypatch.setattr(BurnDownChart, "cardsLeftToDo", 0)
+    assert BurnDownChart.CollectData(snapshot=False) is True
+    assert list(BurnDownChart.graphMap.values()) == snapshot
+    assert snapshot[0] > 0
+
+
+def test_clear_data_drops_snapshots(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("builtins.input", lambda prompt: "YES")
+    monkeypatch.setattr(BurnDownChart, "graphMap", {"2026-10-17": 42})
+    monkeypatch.setattr(BurnDownChart, "startDate", None)
+    monkeypatch.setattr(BurnDownChart, "headingBreakdown", None)
+    BurnDownChart.SaveDataToFile()
+    Snapshots.record("Long Term.txt", 42, datetime(2026, 10, 17, 9, 30))
+    assert BurnDownChart.ClearData() == 0
+    assert Snapshots.load("Long Term.txt", resolution=Snapshots.DAILY) == []
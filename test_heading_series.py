@@ -0,0 +1,33 @@
+import HeadingSeries
+
+
+def test_columns_start_and_end_with_their_heading(tmp_path):
+    table = HeadingSeries.empty_table()
+    assert HeadingSeries.record(table, "2025-11-01", {"A": 10})
+    assert HeadingSeries.record(table, "2025-11-02", {"A": 8, "B": 5})
+    assert HeadingSeries.record(table, "2025-11-03", {"B": 4})
+    assert table["columns"] == {"A": {"start": 0, "values": [10, 8]}, "B": {"start": 1, "values": [5, 4]}}
+    assert HeadingSeries.frame(table) == (["2025-11-01", "2025-11-02", "2025-11-03"], ["A", "B"],
+                                          [[10, 8, 0], [0, 5, 4]])
+    path = str(tmp_path / "Headings.json")
+    HeadingSeries.save(table, path)
+    assert HeadingSeries.load(path) == table
+
+
+def test_rerun_on_the_last_date_replaces_it():
+    table = HeadingSeries.empty_table()
+    HeadingSeries.record(table, "2025-11-01", {"A": 10, "B": 3})
+    HeadingSeries.record(table, "2025-11-02", {"A": 8, "B": 2})
+    HeadingSeries.record(table, "2025-11-02", {"A": 7})
+    assert HeadingSeries.frame(table)[2] == [[10, 7], [3, 0]]
+    assert table["columns"]["B"] == {"start": 0, "values": [3]}
+    # an earlier date already in the table is replaced in place
+    HeadingSeries.record(table, "2025-11-01", {"A": 9})
+    assert HeadingSeries.frame(table) == (["2025-11-01", "2025-11-02"], ["A"], [[9, 7]])
+
+
+def test_dates_before_the_table_are_skipped():
+    table = HeadingSeries.empty_table()
+    HeadingSeries.record(table, "2025-11-05", {"A": 1})
+    assert not HeadingSeries.record(table, "2025-11-01", {"A": 2})
+    assert table == {"dates": ["2025-11-05"], "columns": {"A": {"start": 0, "values": [1]}}}
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+import ActionsFeed
+import HttpCache
+import RunProfile
+import TrelloClient
+from conftest import BOARD_ID
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, text, etag=None):
+        self.text = text
+        self.headers = {"ETag": etag} if etag else {}
+
+
+@pytest.fixture
+def cache(fake_trello, tmp_path, monkeypatch):
+    """The fake Trello with TrelloClient's response cache turned on."""
+    cache = HttpCache.HttpCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(TrelloClient, "_cache", cache)
+    monkeypatch.setattr(RunProfile, "_cache", {})
+    return cache
+
+
+def test_memory_lru_keeps_the_recently_used_entries():
+    cache = HttpCache.HttpCache(None, max_memory=2)
+    for key in ("a", "b"):
+        cache.store(key, "GET /boards/{id}/lists", _Response(key))
+    cache.lookup("a")
+    cache.store("c", "GET /boards/{id}/lists", _Response("c"))
+    assert cache.lookup("a")["body"] == "a"
+    assert cache.lookup("b") is None
+    assert cache.lookup("c")["body"] == "c"
+
+
+def test_disk_lru_evicts_the_least_recently_used_file(tmp_path):
+    cache = HttpCache.HttpCache(str(tmp_path), max_memory=0, max_disk=2)
+    for i, key in enumerate(("a", "b")):
+        cache.store(key, "GET /boards/{id}/lists", _Response(key))
+        os.utime(tmp_path / f"{key}.json", (1000 + i, 1000 + i))
+    os.utime(tmp_path / "a.json", (2000, 2000))  # "a" was read last
+    cache.store("c", "GET /boards/{id}/lists", _Response("c"))
+    assert sorted(os.listdir(tmp_path)) == ["a.json", "c.json"]
+
+
+def test_unchanged_response_is_revalidated_with_304(cache, fake_trello):
+    first = TrelloClient.get(f"/boards/{BOARD_ID}/cards", {"fields": "idList"})
+    second = TrelloClient.get(f"/boards/{BOARD_ID}/cards", {"fields": "idList"})
+    assert second.json() == first.json()
+    assert RunProfile._cache == {HttpCache.MISS: 1, HttpCache.STORE: 1, HttpCache.REVALIDATED: 1}
+    assert fake_trello.request_log["GET /boards/{id}/cards"] == 2
+
+
+def test_write_clears_the_cache(cache, fake_trello):
+    labels = TrelloClient.get(f"/boards/{BOARD_ID}/labels").json()
+    assert TrelloClient.get(f"/boards/{BOARD_ID}/labels").json() == labels
+    assert fake_trello.request_log["GET /boards/{id}/labels"] == 1
+    TrelloClient.post("/labels", {"idBoard": BOARD_ID, "name": "13", "color": "green"})
+    assert len(TrelloClient.get(f"/boards/{BOARD_ID}/labels").json()) == len(labels) + 1
+
+
+def test_full_scan_does_not_serve_lists_or_labels_within_their_ttl(cache, fake_trello):
+    ActionsFeed.full_scan(BOARD_ID)
+    # changed by someone else, so nothing cleared the cache
+    label = fake_trello.board.create_label("13", "green")
+    state = ActionsFeed.full_scan(BOARD_ID)
+    assert state["labels"][label["id"]] == "13"
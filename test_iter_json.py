@@ -0,0 +1,48 @@
+import json
+import time
+
+import pytest
+
+import RunProfile
+import TrelloClient
+from conftest import BOARD_ID
+
+PAYLOAD = [
+    {"id": "5f1a", "idList": "60b2", "idLabels": ["a", "b"], "pos": 65536.5},
+    3, 3.25, -12, 1e-3, 2.5E+10, 0, True, None, "ünïcødé ✓ \"quoted\" ]", [],
+    {"nested": {"list": [1, [2, [3]]], "text": "a,b]c"}},
+]
+
+
+def _chunks(raw, size):
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 16, 1024])
+def test_elements_survive_any_chunk_boundary(size):
+    raw = json.dumps(PAYLOAD, ensure_ascii=False, indent=1).encode()
+    assert list(TrelloClient.iter_json_array(_chunks(raw, size))) == PAYLOAD
+
+
+def test_empty_array():
+    assert list(TrelloClient.iter_json_array([b" [ ", b"]"])) == []
+
+
+def test_truncated_or_wrong_payloads_raise():
+    with pytest.raises(ValueError):
+        list(TrelloClient.iter_json_array(_chunks(b'[{"id": 1}, {"id"', 4)))
+    with pytest.raises(ValueError):
+        list(TrelloClient.iter_json_array([b"[1, 2"]))
+    with pytest.raises(ValueError):
+        list(TrelloClient.iter_json_array([b'{"message": "unauthorized"}']))
+
+
+def test_streamed_request_is_profiled_once_the_body_is_read(fake_trello, monkeypatch):
+    monkeypatch.setattr(RunProfile, "_requests", {})
+    sent = fake_trello.bytes_sent
+    for i, card in enumerate(TrelloClient.iter_json(f"/boards/{BOARD_ID}/cards", {"fields": "idList"})):
+        if i == 0:
+            time.sleep(0.3)
+    entry = RunProfile._requests["GET /boards/{id}/cards"]
+    assert entry["bytes"] == fake_trello.bytes_sent - sent
+    assert entry["latencies"][0] >= 0.3
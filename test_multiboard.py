@@ -0,0 +1,18 @@
+import BoardAggregate
+import MultiBoard
+import SeriesStore
+from conftest import BOARD_ID
+
+
+def test_failing_board_keeps_its_last_value_in_the_rollup(fake_trello):
+    config = {"rollup": "Portfolio.txt", "boards": [
+        {"name": "Web", "id": BOARD_ID, "series": "Web Long Term.txt"},
+        {"name": "Gone", "id": "no-such-board", "series": "Gone Long Term.txt"},
+    ]}
+    SeriesStore.write_series("Gone Long Term.txt", [("2026-10-16", 5)], "2026-10-16")
+    results = MultiBoard.collect_all(config, "2026-10-17")
+    assert [result["error"] is None for result in results] == [True, False]
+    sprint = BoardAggregate.collect(BOARD_ID)["sprint"]
+    assert SeriesStore.read_series("Web Long Term.txt")[0] == [("2026-10-17", sprint)]
+    assert SeriesStore.read_series("Gone Long Term.txt")[0] == [("2026-10-16", 5)]
+    assert SeriesStore.read_series("Portfolio.txt")[0] == [("2026-10-17", sprint + 5)]
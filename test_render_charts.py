@@ -0,0 +1,26 @@
+import os
+import shutil
+
+import RenderCharts
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+CHECKED_IN = ["Long Term.txt", "ProductInfo.txt", "Sprint1 BurnDownChart", "Sprint2 BurnDownChart"]
+
+
+def test_checked_in_data_renders_every_chart(tmp_path, monkeypatch, capsys):
+    for name in CHECKED_IN:
+        shutil.copy(os.path.join(REPO, name), tmp_path / name)
+    monkeypatch.chdir(tmp_path)
+    RenderCharts.render_all(str(tmp_path / "charts"), workers=1)
+    out = capsys.readouterr().out
+    assert "Skipping invalid date" not in out
+    assert "No data to plot" not in out
+    for name in ("Long_Term", "Sprint1_BurnDownChart", "Sprint2_BurnDownChart", "ProductInfo", "Overlay"):
+        assert os.path.getsize(tmp_path / "charts" / f"{name}.png") > 0
+
+
+def test_parse_dated_accepts_dates_and_snapshot_timestamps():
+    dates, values = RenderCharts.parse_dated([("2025-11-24T09:00", 5), ("2025-11-23", 7), ("2025-11-24T10:30:00", 4),
+                                              ("not a date", 1)])
+    assert [d.isoformat() for d in dates] == ["2025-11-23T00:00:00", "2025-11-24T09:00:00", "2025-11-24T10:30:00"]
+    assert values == [7, 5, 4]
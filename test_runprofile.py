@@ -0,0 +1,11 @@
+import RunProfile
+
+
+def test_percentile_is_nearest_rank():
+    assert RunProfile._percentile([], 50) == 0.0
+    assert RunProfile._percentile([1, 2], 50) == 1
+    assert RunProfile._percentile([1, 2, 3, 4, 5, 6], 50) == 3
+    assert RunProfile._percentile(list(range(1, 11)), 50) == 5
+    assert RunProfile._percentile(list(range(1, 11)), 95) == 10
+    assert RunProfile._percentile(list(range(1, 101)), 95) == 95
+    assert RunProfile._percentile([7], 0) == 7
@@ -0,0 +1,76 @@
+import os
+import random
+import shutil
+from datetime import date, timedelta
+
+import SeriesStore
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+CHECKED_IN = ["Long Term.txt", "ProductInfo.txt", "Sprint1 BurnDownChart", "Sprint2 BurnDownChart"]
+
+
+def _full_rewrite(entries, start_date):
+    text = "".join(f"{d},{SeriesStore.format_value(v)}\n" for d, v in entries)
+    if start_date is not None:
+        text += f"StartDate,{start_date}\n"
+    return text.encode()
+
+
+def _parse(path):
+    entries, start_date = [], None
+    with open(path, "r") as f:
+        for line in f:
+            parts = line.strip().split(",")
+            if parts[0] == "StartDate":
+                start_date = parts[1] if len(parts) > 1 else None
+            elif len(parts) > 1:
+                entries.append((parts[0], SeriesStore.parse_value(parts[1])))
+    return entries, start_date
+
+
+def test_read_series_matches_parsing_the_checked_in_files(tmp_path):
+    store = str(tmp_path / "series.db")
+    for name in CHECKED_IN:
+        shutil.copy(os.path.join(REPO, name), tmp_path / name)
+        assert SeriesStore.read_series(str(tmp_path / name), store) == _parse(tmp_path / name)
+
+
+def test_write_series_matches_a_full_rewrite(tmp_path):
+    rng = random.Random(7)
+    path = tmp_path / "Long Term.txt"
+    shutil.copy(os.path.join(REPO, "Long Term.txt"), path)
+    store = str(tmp_path / "series.db")
+    entries, start_date = SeriesStore.read_series(str(path), store)
+    for step in range(200):
+        entries = list(entries)
+        change = rng.choice(("append", "edit", "truncate", "float", "start"))
+        if change == "append" or not entries:
+            # every writer keeps one row per date
+            last = date.fromisoformat(entries[-1][0]) if entries else date(2026, 2, 1)
+            entries.append(((last + timedelta(days=rng.randrange(1, 3))).strftime("%Y-%m-%d"), rng.randrange(100)))
+        elif change == "edit":
+            i = rng.randrange(len(entries))
+            entries[i] = (entries[i][0], rng.randrange(100))
+        elif change == "truncate":
+            entries = entries[:rng.randrange(len(entries) + 1)]
+        elif change == "float":
+            i = rng.randrange(len(entries))
+            entries[i] = (entries[i][0], rng.choice((2.5, 3.0, 12.25)))
+        else:
+            start_date = rng.choice((None, "2025-11-23", "2026-01-01"))
+        SeriesStore.write_series(str(path), entries, start_date, store)
+        assert path.read_bytes() == _full_rewrite(entries, start_date)
+        assert _parse(path) == SeriesStore.read_series(str(path), store)
+
+
+def test_external_edit_is_reindexed(tmp_path):
+    path = tmp_path / "Sprint1 BurnDownChart"
+    shutil.copy(os.path.join(REPO, "Sprint1 BurnDownChart"), path)
+    store = str(tmp_path / "series.db")
+    SeriesStore.read_series(str(path), store)
+    with open(path, "a") as f:
+        f.write("2030-01-01,1\n")
+    assert SeriesStore.read_series(str(path), store) == _parse(path)
+    SeriesStore.set_value(str(path), "2030-01-02", 0, store=store)
+    assert SeriesStore.read_series(str(path), store) == _parse(path)
+    assert _parse(path)[0][-1] == ("2030-01-02", 0)
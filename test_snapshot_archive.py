@@ -0,0 +1,47 @@
+import os
+
+import BoardAggregate
+import SnapshotArchive
+from conftest import BOARD_ID
+
+RULES = {"sprint_prefix": "backlog", "finished_words": ["done", "sp 4"]}
+KEYS = ("sprint", "product", "finished", "board", "headings")
+
+
+def _objects(directory):
+    return sum(len(files) for _, _, files in os.walk(os.path.join(directory, "objects")))
+
+
+def _totals(totals):
+    return {key: totals[key] for key in KEYS}
+
+
+def test_replay_reproduces_the_live_totals(fake_trello, tmp_path, monkeypatch):
+    directory = str(tmp_path / "archive")
+    monkeypatch.setenv("SNAPSHOT_ARCHIVE", "1")
+    monkeypatch.setenv("SNAPSHOT_ARCHIVE_DIR", directory)
+    live = [BoardAggregate.collect(BOARD_ID)]
+    stored = _objects(directory)
+    live.append(BoardAggregate.collect(BOARD_ID))
+    # an unchanged board only adds a log line
+    assert _objects(directory) == stored
+    board = fake_trello.board
+    card = next(c for c in board.cards.values() if board.lists[0]["id"] == c["idList"])
+    board.move_card(card["id"], board.lists[-1]["id"])
+    live.append(BoardAggregate.collect(BOARD_ID))
+    assert _objects(directory) - stored == 2  # the moved card's chunk and the new manifest
+
+    runs = SnapshotArchive.SnapshotArchive(directory).runs(BOARD_ID)
+    assert len(runs) == 3
+    replayed = SnapshotArchive.replay(BOARD_ID, directory=directory)
+    # runs within the same second are ordered by manifest id, so compare them unordered
+    assert sorted((_totals(t) for _, t in replayed), key=repr) == sorted((_totals(t) for t in live), key=repr)
+
+    # under other rules, and across worker processes: the last run is the board as it is now
+    monkeypatch.setenv("SNAPSHOT_ARCHIVE", "0")
+    expected = _totals(BoardAggregate.collect(BOARD_ID, RULES))
+    assert expected != _totals(live[-1])
+    for workers in (1, 2):
+        replayed = SnapshotArchive.replay(BOARD_ID, RULES, workers, directory)
+        assert len(replayed) == 3
+        assert expected in [_totals(t) for _, t in replayed]
@@ -0,0 +1,58 @@
+import os
+import shutil
+from datetime import date, datetime, timedelta
+
+import RenderCharts
+import SeriesStore
+import Snapshots
+
+
+def _write_days(path, days, start=date(2025, 11, 23)):
+    entries = [((start + timedelta(days=i)).strftime("%Y-%m-%d"), 100 - i) for i in range(days)]
+    SeriesStore.write_series(str(path), entries, entries[0][0], str(path.parent / "series.db"))
+    return entries
+
+
+def test_date_only_series_loads_at_hourly_resolution(tmp_path):
+    path = tmp_path / "Long Term.txt"
+    entries = _write_days(path, 30)
+    store = str(tmp_path / "series.db")
+    assert Snapshots.resolution_for(entries[0][0], entries[-1][0]) == Snapshots.HOURLY
+    rows = Snapshots.load(str(path), store=store)
+    assert rows == entries
+    dates, values = RenderCharts.parse_dated(rows)
+    assert len(dates) == len(values) == 30
+
+
+def test_snapshots_replace_file_value_for_their_day(tmp_path):
+    path = tmp_path / "Long Term.txt"
+    entries = _write_days(path, 3)
+    store = str(tmp_path / "series.db")
+    Snapshots.record(str(path), 55, datetime(2025, 11, 25, 9, 30), store)
+    Snapshots.record(str(path), 50, datetime(2025, 11, 25, 15, 0), store)
+    hourly = Snapshots.load(str(path), resolution=Snapshots.HOURLY, store=store)
+    assert hourly == entries[:2] + [("2025-11-25T09:00", 55), ("2025-11-25T15:00", 50)]
+    daily = Snapshots.load(str(path), resolution=Snapshots.DAILY, store=store)
+    assert daily == entries
+    assert len(RenderCharts.parse_dated(hourly)[0]) == 4
+
+
+def test_checked_in_long_term_parses(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Long Term.txt"), tmp_path / "Long Term.txt")
+    monkeypatch.chdir(tmp_path)
+    entries, _ = SeriesStore.read_series("Long Term.txt", str(tmp_path / "series.db"))
+    rows = Snapshots.load("Long Term.txt", store=str(tmp_path / "series.db"))
+    dates, _ = RenderCharts.parse_dated(rows)
+    assert len(dates) == len(entries)
+
+
+def test_clear_drops_every_tier(tmp_path):
+    path = tmp_path / "Long Term.txt"
+    _write_days(path, 3)
+    store = str(tmp_path / "series.db")
+    Snapshots.record(str(path), 42, datetime(2025, 11, 25, 9, 30), store)
+    Snapshots.record(str(path), 40, datetime(2026, 10, 17, 9, 30), store)
+    SeriesStore.write_series(str(path), [], None, store)
+    Snapshots.clear(str(path), store)
+    assert Snapshots.load(str(path), resolution=Snapshots.DAILY, store=store) == []
+    assert Snapshots.load(str(path), resolution=Snapshots.RAW, store=store) == []
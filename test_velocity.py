@@ -0,0 +1,50 @@
+import random
+from datetime import date, timedelta
+
+import numpy as np
+
+import Velocity
+
+
+def _series(rng, points, start=date(2025, 10, 1)):
+    day, value, entries = start, 200.0, []
+    for _ in range(points):
+        entries.append((day.strftime("%Y-%m-%d"), value))
+        day += timedelta(days=rng.choice((1, 1, 1, 2, 3)))
+        value = max(value - rng.randrange(0, 15), 0)
+    return entries
+
+
+def _reference(entries, window, rolling_window):
+    """Per-series loops over the same definitions analyze_many() vectorizes."""
+    days, values = Velocity.series_arrays(entries)
+    last = days[-1]
+    fit = days >= last - np.timedelta64(window, "D")
+    deltas = [-(values[k + 1] - values[k]) / max(int((days[k + 1] - days[k]).astype(int)), 1)
+              for k in range(len(days) - 1)]
+    first = int(np.argmax(days >= last - np.timedelta64(rolling_window, "D")))
+    span = int((last - days[first]).astype(int))
+    rolling = (values[first] - values[-1]) / span if span else 0.0
+    slope = np.polyfit((days[fit] - days[fit][0]).astype(float), values[fit], 1)[0]
+    return deltas, rolling, -slope
+
+
+def test_analyze_many_matches_per_series_reference():
+    rng = random.Random(3)
+    named = {f"s{i}": _series(rng, rng.randrange(3, 400)) for i in range(12)}
+    for window, rolling_window in ((14, 7), (3, 7), (30, 5)):
+        results = Velocity.analyze_many(named, window=window, rolling_window=rolling_window)
+        for name, entries in named.items():
+            result = results[name]
+            deltas, rolling, velocity = _reference(entries, window, rolling_window)
+            if result is None:
+                continue
+            assert np.allclose(result["deltas"], deltas)
+            assert len(result["delta_dates"]) == len(deltas)
+            assert abs(result["rolling_velocity"] - rolling) < 1e-9
+            assert abs(result["velocity"] - velocity) < 1e-9
+
+
+def test_short_series_get_no_forecast():
+    results = Velocity.analyze_many({"one": [("2025-11-01", 5)], "none": []})
+    assert results == {"one": None, "none": None}
@@ -0,0 +1,67 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+import pytest
+import requests
+
+import BoardAggregate
+import Watch
+from conftest import BOARD_ID
+
+# recorded webhook deliveries for the fake board: a sprint card moved to Done
+# (delivered twice), a label added to another sprint card and a comment
+PAYLOADS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "webhook_payloads.jsonl")
+CALLBACK_URL = "https://example.org/trello"
+
+
+@pytest.fixture
+def receiver(fake_trello):
+    watcher = Watch.Watcher(BOARD_ID, debounce=0.2, max_delay=5.0)
+    server = Watch.WebhookServer(("127.0.0.1", 0), watcher)
+    watcher.start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    watcher.stop()
+
+
+def _wait_for_flush(watcher, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while watcher.flushes == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def test_recorded_payloads_are_applied_once_and_flushed(receiver, fake_trello):
+    server, url = receiver
+    before = BoardAggregate.collect(BOARD_ID)["sprint"]
+    assert Watch.send_payloads(PAYLOADS, url) == 4
+    _wait_for_flush(server.watcher)
+    # the duplicate delivery and the comment are dropped
+    assert server.watcher.events == 2
+    assert server.watcher.flushes == 1
+    # the store's connection belongs to the flush thread, so the text file is read directly
+    with open(Watch.SERIES_FILE, "r") as f:
+        values = [line.split(",")[1].strip() for line in f if line[:1].isdigit()]
+    # Card 0 (8 hours) left the sprint and Card 4 gained a 2-hour label
+    assert values == [str(before - 8 + 2)]
+
+
+def test_unsigned_or_malformed_payloads_are_rejected(receiver):
+    server, url = receiver
+    server.callback_url = CALLBACK_URL
+    server.secret = "secret"
+    with open(PAYLOADS, "rb") as f:
+        body = f.readline().strip()
+    assert requests.post(url, data=body, headers={"X-Trello-Webhook": "forged"}).status_code == 401
+    digest = hmac.new(b"secret", body + CALLBACK_URL.encode(), hashlib.sha1).digest()
+    signature = base64.b64encode(digest).decode()
+    assert requests.post(url, data=body, headers={"X-Trello-Webhook": signature}).status_code == 200
+    assert server.watcher.events == 1
+    server.secret = None
+    assert requests.post(url, data=b"[1, 2]").status_code == 400
+    assert requests.post(url, data=b'{"action": "updateCard"}').status_code == 400
+    assert requests.post(url, data=b"not json").status_code == 400